@@ -0,0 +1,110 @@
+"""
+AgriLens weather alert rules
+Declarative agronomic alert rules evaluated as vectorized NumPy operations
+over the forecasts of many locations at once. Three rule kinds are supported:
+  threshold    - any forecast step beyond a limit (e.g. heat, frost, wind)
+  window_sum   - a rolling sum over a time window beyond a limit (e.g. heavy rain)
+  consecutive  - a condition holding for at least N consecutive hours (e.g. fungal-risk humidity)
+"""
+
+import operator
+from collections import namedtuple
+
+import numpy as np
+
+# Forecast entries are 3-hourly; rules look at the first ALERT_WINDOW entries
+FORECAST_STEP_HOURS = 3
+ALERT_WINDOW = 24
+
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+Rule = namedtuple("Rule", ["name", "kind", "column", "op", "threshold", "hours", "severity"], defaults=(None, "warning"))
+
+# `value` is the extreme value for threshold rules, the largest window total for
+# window_sum rules and the longest run in hours for consecutive rules
+Alert = namedtuple("Alert", ["location", "rule", "severity", "value", "start", "hours"])
+
+DEFAULT_RULES = (
+    Rule("heat", "threshold", "temperature", ">", 35),
+    Rule("frost", "threshold", "temperature", "<", 0),
+    Rule("wind", "threshold", "wind_speed", ">", 15),
+    Rule("heavy_rain", "window_sum", "rain", ">", 20, hours=ALERT_WINDOW * FORECAST_STEP_HOURS),
+    Rule("fungal_risk", "consecutive", "humidity", ">=", 90, hours=12)
+)
+
+# Plain-text descriptions for reports: (title, value label, unit, advice)
+ALERT_TEXT = {
+    "heat": ("Heat Warning", "Maximum temperature expected", "°C", "Take precautions to protect crops from extreme heat."),
+    "frost": ("Frost Warning", "Minimum temperature expected", "°C", "Implement frost protection measures immediately."),
+    "wind": ("Wind Warning", "Maximum wind speed expected", "m/s", "Secure vulnerable structures and plants."),
+    "heavy_rain": ("Heavy Rain Warning", "Total rainfall expected", "mm", "Ensure proper drainage to prevent waterlogging and root rot."),
+    "fungal_risk": ("Fungal Disease Risk", "Hours of very high humidity expected", "h", "Inspect leaves closely and consider a preventive fungicide application.")
+}
+
+def stack_forecasts(forecasts, columns, horizon=ALERT_WINDOW):
+    """
+    Stacks the first `horizon` steps of each forecast DataFrame into
+    (locations, horizon) arrays per column, padded with NaN (NaT for times).
+    """
+    stacked = {column: np.full((len(forecasts), horizon), np.nan) for column in columns}
+    times = np.full((len(forecasts), horizon), np.datetime64("NaT"), dtype="datetime64[s]")
+    for row, forecast in enumerate(forecasts):
+        steps = min(len(forecast), horizon)
+        for column in columns:
+            stacked[column][row, :steps] = forecast[column].to_numpy()[:steps]
+        times[row, :steps] = forecast['datetime'].to_numpy()[:steps]
+    return stacked, times
+
+def _threshold(values, rule):
+    mask = OPERATORS[rule.op](values, rule.threshold) # NaN padding compares False
+    extreme = np.nanmin(values, axis=1) if rule.op.startswith("<") else np.nanmax(values, axis=1)
+    return mask.any(axis=1), extreme, mask.argmax(axis=1), np.zeros(len(values))
+
+def _window_sum(values, rule):
+    steps = min(max(1, rule.hours // FORECAST_STEP_HOURS), values.shape[1])
+    totals = np.cumsum(np.nan_to_num(values), axis=1)
+    totals = np.concatenate([np.zeros((len(values), 1)), totals], axis=1)
+    window_totals = totals[:, steps:] - totals[:, :-steps] # Rolling sums; [i] covers steps i..i+steps-1
+    best = window_totals.argmax(axis=1)
+    value = window_totals[np.arange(len(values)), best]
+    return OPERATORS[rule.op](value, rule.threshold), value, best, np.full(len(values), steps * FORECAST_STEP_HOURS)
+
+def _consecutive(values, rule):
+    mask = OPERATORS[rule.op](values, rule.threshold)
+    index = np.arange(values.shape[1])
+    # Length of the run of True ending at each step: distance to the most recent False
+    last_false = np.maximum.accumulate(np.where(mask, -1, index), axis=1)
+    runs = index - last_false
+    longest = runs.max(axis=1)
+    start = runs.argmax(axis=1) - longest + 1
+    hours = longest * FORECAST_STEP_HOURS
+    return hours >= rule.hours, hours, np.maximum(start, 0), hours
+
+EVALUATORS = {"threshold": _threshold, "window_sum": _window_sum, "consecutive": _consecutive}
+
+def evaluate_rules(forecasts, rules=DEFAULT_RULES, horizon=ALERT_WINDOW):
+    """
+    Evaluates `rules` against {location: forecast DataFrame} in one pass per
+    rule across all locations. Returns the triggered Alerts, grouped by location
+    in input order, then by rule order.
+    """
+    locations = list(forecasts)
+    if not locations:
+        return []
+    stacked, times = stack_forecasts([forecasts[l] for l in locations], {rule.column for rule in rules}, horizon)
+
+    triggered = []
+    for rule in rules:
+        fired, value, start, hours = EVALUATORS[rule.kind](stacked[rule.column], rule)
+        for row in np.flatnonzero(fired):
+            triggered.append((row, Alert(
+                locations[row], rule.name, rule.severity, float(value[row]),
+                times[row, start[row]].astype(object), int(hours[row])
+            )))
+    return [alert for _, alert in sorted(triggered, key=lambda item: item[0])]
+
+def describe_alert(alert):
+    """Returns a plain-English line for an alert, e.g. for the PDF report."""
+    title, label, unit, advice = ALERT_TEXT.get(alert.rule, (alert.rule.replace("_", " ").title(), "Value", "", ""))
+    value = f"{alert.value:.0f}" if unit == "h" else f"{alert.value:.1f}"
+    return f"{title}: {label}: {value} {unit}. {advice}".replace(" .", ".")
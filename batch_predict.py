@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+AgriLens Batch Disease Detection
+Runs the crop classifier and per-crop disease models over a folder or manifest
+of leaf images and writes the results as CSV or JSONL.
+
+Usage:
+    python batch_predict.py photos/ --output results.csv
+    python batch_predict.py manifest.txt --output results.jsonl --batch-size 64
+    python batch_predict.py photos/ --crop Apple --output apple.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from inference import (
+    BACKENDS, CROP_CLASSIFIER_MODEL_PATH, load_disease_model, load_crop_classifier_model,
+    load_image_array, predict_batch, decode_prediction, check_disease_prediction,
+    backend_model_path, disease_model_paths, disease_model_size, release_model_memory
+)
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, hash_image_array, model_version
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+RESULT_FIELDS = [
+    "path", "crop", "crop_confidence", "status", "disease", "confidence", "error"
+]
+
+def collect_image_paths(source):
+    """
+    Returns the image paths to process. `source` is either a directory (scanned
+    recursively) or a manifest file: a .csv with a `path` column, or any other
+    text file with one path per line. Manifest paths are relative to the manifest.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, newline="") as f:
+        if source.lower().endswith(".csv"):
+            entries = [row["path"] for row in csv.DictReader(f) if row.get("path")]
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    return [entry if os.path.isabs(entry) else os.path.join(base_dir, entry) for entry in entries]
+
+class ResultWriter:
+    """Streams result rows to a CSV or JSONL file."""
+    def __init__(self, out_path, fmt):
+        self.fmt = fmt
+        self.file = open(out_path, "w", newline="")
+        if fmt == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.file.close()
+
+def empty_result(path):
+    row = dict.fromkeys(RESULT_FIELDS, "")
+    row["path"] = path
+    return row
+
+def load_batch(paths):
+    """Loads a list of image paths, returning (stacked array, loaded indices, rows)."""
+    rows = [empty_result(path) for path in paths]
+    arrays, loaded = [], []
+    for i, path in enumerate(paths):
+        try:
+            arrays.append(load_image_array(path))
+            loaded.append(i)
+        except Exception as e:
+            rows[i]["status"] = "Error"
+            rows[i]["error"] = f"Could not load image: {e}"
+
+    batch = np.stack(arrays) if arrays else None
+    return batch, loaded, rows
+
+class BatchPredictor:
+    """Runs the two-step crop + disease analysis over whole batches of images."""
+    def __init__(self, crop=None, batch_size=32, backend="keras", cache=None, model_budget_mb=2048):
+        self.crop = crop
+        self.batch_size = batch_size
+        self.backend = backend
+        self.cache = cache
+        self.registry = ModelRegistry(
+            lambda name: load_disease_model(name, backend),
+            budget_mb=model_budget_mb,
+            size_hint=lambda name: disease_model_size(name, backend),
+            release=lambda: release_model_memory(backend)
+        )
+        self.model_versions = {}
+        self.classifier, self.classifier_classes = (None, None) if crop else load_crop_classifier_model(backend)
+        if not crop and self.classifier is None:
+            raise FileNotFoundError("Crop classifier model not found. Pass --crop to select a crop manually.")
+
+    def run_model(self, model, model_path, batch, hashes, class_names):
+        """
+        Returns the decoded (predicted_class, confidence) for every row of `batch`.
+        With a cache, only images it has not seen (deduplicated by pixel hash) reach the model.
+        """
+        if self.cache is None:
+            return [decode_prediction(p, class_names) for p in predict_batch(model, batch, self.batch_size)]
+
+        if model_path not in self.model_versions:
+            self.model_versions[model_path] = model_version(model_path)
+        keys = [PredictionCache.make_key(self.model_versions[model_path], h) for h in hashes]
+        results = {key: self.cache.get(key) for key in dict.fromkeys(keys)}
+
+        missing = [key for key, result in results.items() if result is None]
+        if missing:
+            first_row = {key: keys.index(key) for key in missing}
+            probabilities = predict_batch(model, batch[[first_row[key] for key in missing]], self.batch_size)
+            for key, p in zip(missing, probabilities):
+                results[key] = decode_prediction(p, class_names)
+                self.cache.put(key, results[key])
+
+        return [results[key] for key in keys]
+
+    def predict(self, paths):
+        """Returns one result row per path, in order."""
+        batch, loaded, rows = load_batch(paths)
+        if batch is None:
+            return rows
+        hashes = [hash_image_array(img_array) for img_array in batch] if self.cache else None
+
+        # Step 1: Classify the crop for the whole batch at once
+        crops = {}
+        if self.crop:
+            crops[self.crop] = list(range(len(loaded)))
+            for i in loaded:
+                rows[i]["crop"] = self.crop
+        else:
+            classifier_path = backend_model_path(CROP_CLASSIFIER_MODEL_PATH, self.backend)
+            crop_results = self.run_model(self.classifier, classifier_path, batch, hashes, self.classifier_classes)
+            for j, i in enumerate(loaded):
+                predicted_crop, crop_confidence = crop_results[j]
+                rows[i]["crop"] = str(predicted_crop)
+                rows[i]["crop_confidence"] = crop_confidence
+                if str(predicted_crop).lower() == "unknown":
+                    rows[i]["status"] = "Unknown Crop"
+                else:
+                    crops.setdefault(str(predicted_crop), []).append(j)
+
+        # Step 2: Run each crop's disease model over its sub-batch
+        for crop, positions in crops.items():
+            try:
+                model, class_names = self.registry.get(crop)
+            except FileNotFoundError as e:
+                for j in positions:
+                    rows[loaded[j]]["status"] = "Error"
+                    rows[loaded[j]]["error"] = str(e)
+                continue
+
+            model_path = backend_model_path(disease_model_paths(crop)[0], self.backend)
+            sub_hashes = [hashes[j] for j in positions] if hashes else None
+            disease_results = self.run_model(model, model_path, batch[positions], sub_hashes, class_names)
+            for k, j in enumerate(positions):
+                pred_class, confidence = check_disease_prediction(*disease_results[k], crop)
+                row = rows[loaded[j]]
+                row["disease"] = str(pred_class)
+                row["confidence"] = confidence
+                if pred_class == "Incompatible Image":
+                    row["status"] = "Incompatible Image"
+                else:
+                    row["status"] = "Healthy" if "healthy" in str(pred_class).lower() else "Diseased"
+
+        return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run AgriLens disease detection over a folder or manifest of images.")
+    parser.add_argument("source", help="Image directory, or a manifest file (.txt with one path per line, or .csv with a 'path' column)")
+    parser.add_argument("-o", "--output", default="batch_results.csv", help="Output file (default: batch_results.csv)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from the output file extension)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per model call (default: 32)")
+    parser.add_argument("--crop", help="Skip the crop classifier and analyze every image as this crop (e.g. Apple)")
+    parser.add_argument("--backend", choices=BACKENDS, default="keras", help="Model runtime (default: keras)")
+    parser.add_argument("--model-budget-mb", type=float, default=2048, help="RAM budget for resident disease models (default: 2048)")
+    parser.add_argument("--cache-dir", help="Directory for the on-disk prediction cache shared between runs")
+    parser.add_argument("--cache-disk-entries", type=int, default=100000,
+                        help="Entries the on-disk cache keeps before pruning the least recently used (default: 100000)")
+    parser.add_argument("--no-cache", action="store_true", help="Run every image through the models, even duplicates")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if args.output.lower().endswith((".jsonl", ".json")) else "csv")
+
+    paths = collect_image_paths(args.source)
+    if not paths:
+        print(f"❌ No images found in {args.source}")
+        return 1
+
+    print(f"🔍 Found {len(paths)} images. Loading models...")
+    cache = None if args.no_cache else PredictionCache(
+        max_entries=100000, disk_dir=args.cache_dir, max_disk_entries=args.cache_disk_entries
+    )
+    try:
+        predictor = BatchPredictor(crop=args.crop, batch_size=args.batch_size, backend=args.backend, cache=cache,
+                                   model_budget_mb=args.model_budget_mb)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    writer = ResultWriter(args.output, fmt)
+    counts = {}
+    start = time.perf_counter()
+    try:
+        for offset in range(0, len(paths), args.batch_size):
+            for row in predictor.predict(paths[offset:offset + args.batch_size]):
+                writer.write(row)
+                counts[row["status"]] = counts.get(row["status"], 0) + 1
+            done = min(offset + args.batch_size, len(paths))
+            elapsed = time.perf_counter() - start
+            print(f"   {done}/{len(paths)} images ({done / elapsed:.1f} images/sec)")
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    print("=" * 50)
+    print(f"✅ Processed {len(paths)} images in {elapsed:.2f}s ({len(paths) / elapsed:.1f} images/sec)")
+    for status, count in sorted(counts.items()):
+        print(f"   {status}: {count}")
+    if cache:
+        stats = cache.stats()
+        print(f"   Prediction cache: {stats['memory_hits'] + stats['disk_hits']} hits, {stats['misses']} misses")
+    print(f"📄 Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+AgriLens Alert Rules Equivalence Check
+Generates random forecasts around the alert thresholds and checks that the
+vectorized rules engine (alert_rules.evaluate_rules) raises exactly the heat,
+frost, wind and heavy-rain alerts, with the same values, as the per-forecast
+checks the dashboard used before it. All forecasts are evaluated in one
+evaluate_rules call, so the multi-location path is what gets checked.
+
+Usage:
+    python benchmarks/alert_rules_check.py                 # 500 forecasts
+    python benchmarks/alert_rules_check.py --forecasts 5000 --seed 7
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from alert_rules import ALERT_WINDOW, FORECAST_STEP_HOURS, evaluate_rules
+
+# The rules that replaced the previous dashboard checks
+LEGACY_RULES = ("heat", "frost", "wind", "heavy_rain")
+
+def legacy_alerts(forecast):
+    """The dashboard's previous alert checks: (kind, value) pairs over the first ALERT_WINDOW entries."""
+    window = forecast.iloc[:ALERT_WINDOW]
+    max_temp = window['temperature'].max()
+    min_temp = window['temperature'].min()
+    max_wind = window['wind_speed'].max()
+    total_rain = window['rain'].sum()
+
+    alerts = []
+    if max_temp > 35:
+        alerts.append(("heat", max_temp))
+    if min_temp < 0:
+        alerts.append(("frost", min_temp))
+    if max_wind > 15:
+        alerts.append(("wind", max_wind))
+    if total_rain > 20:
+        alerts.append(("heavy_rain", total_rain))
+    return alerts
+
+def random_forecast(rng, start):
+    """A forecast of 1-40 three-hourly steps whose values often straddle the alert thresholds."""
+    steps = int(rng.integers(1, 41))
+    base = rng.uniform(-8, 40)
+    rain = rng.exponential(rng.uniform(0.1, 3), steps) * (rng.random(steps) < rng.uniform(0, 1))
+    return pd.DataFrame({
+        'datetime': pd.date_range(start, periods=steps, freq=f"{FORECAST_STEP_HOURS}h"),
+        'temperature': base + rng.normal(0, 4, steps),
+        'humidity': rng.uniform(40, 100, steps),
+        'wind_speed': rng.gamma(2, rng.uniform(1, 8), steps),
+        'rain': rain
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the alert rules engine against the previous dashboard alert checks.")
+    parser.add_argument("--forecasts", type=int, default=500, help="Random forecasts to check (default: 500)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    start = pd.Timestamp("2026-01-01")
+    forecasts = {f"farm-{i}": random_forecast(rng, start) for i in range(args.forecasts)}
+
+    began = time.perf_counter()
+    alerts = evaluate_rules(forecasts)
+    seconds = time.perf_counter() - began
+
+    engine = {location: [] for location in forecasts}
+    for alert in alerts:
+        if alert.rule in LEGACY_RULES:
+            engine[alert.location].append((alert.rule, alert.value))
+
+    mismatches = 0
+    triggered = 0
+    for location, forecast in forecasts.items():
+        expected = legacy_alerts(forecast)
+        triggered += len(expected)
+        actual = engine[location]
+        same = [kind for kind, _ in expected] == [kind for kind, _ in actual] and all(
+            np.isclose(a, b) for (_, a), (_, b) in zip(expected, actual)
+        )
+        if not same:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ {location}: previous {expected} vs engine {actual}")
+
+    print(f"🔍 {args.forecasts} forecasts, {triggered} alerts from the previous checks, "
+          f"evaluated by the engine in {seconds * 1000:.1f} ms")
+    if mismatches:
+        print(f"❌ {mismatches} forecasts differ")
+        return 1
+    print("✅ The engine matches the previous alert checks on every forecast")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
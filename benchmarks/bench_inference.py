@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+AgriLens Inference Benchmark
+Measures the cost of the disease pipeline (predict_crop + predict_disease) on
+stand-in models with the same (224, 224, 3) /255 input as the shipped ones,
+since the .h5 files in the repo are LFS pointers. Reports p50/p95/p99 latency
+and throughput across batch sizes, thread counts and backends, and
+writes machine-readable JSON that can be compared between releases.
+
+Usage:
+    python benchmarks/bench_inference.py --output bench.json
+    python benchmarks/bench_inference.py --threads 1 2 4 --backends keras tflite-int8
+    python benchmarks/bench_inference.py --output new.json --compare old.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from inference import BACKENDS, IMAGE_SIZE
+
+# Stand-ins for the shipped models: Apple/Corn/Unknown classifier and a 4-class disease model
+STANDIN_MODELS = {"crop_classifier": 3, "disease": 4}
+
+RESULT_KEY = ("scenario", "backend", "threads", "batch_size")
+
+def build_standin(num_classes, architecture):
+    """Builds an untrained model with the app's input shape and softmax output."""
+    import tensorflow as tf
+
+    inputs = tf.keras.Input(shape=IMAGE_SIZE + (3,))
+    if architecture == "mobilenetv2":
+        base = tf.keras.applications.MobileNetV2(input_tensor=inputs, include_top=False, weights=None, pooling="avg")
+        features = base.output
+    else:
+        x = tf.keras.layers.Conv2D(16, 3, strides=2, activation="relu")(inputs)
+        x = tf.keras.layers.Conv2D(32, 3, strides=2, activation="relu")(x)
+        x = tf.keras.layers.Conv2D(64, 3, strides=2, activation="relu")(x)
+        features = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(num_classes, activation="softmax")(features)
+    return tf.keras.Model(inputs, outputs)
+
+def prepare_models(model_dir, architecture, backends):
+    """Saves stand-in Keras models and their TFLite exports into `model_dir`."""
+    from export_tflite import convert
+    from inference import tflite_model_path
+
+    rng = np.random.default_rng(0)
+    calibration = rng.random((16,) + IMAGE_SIZE + (3,), dtype=np.float32)
+    for name, num_classes in STANDIN_MODELS.items():
+        model = build_standin(num_classes, architecture)
+        model_path = os.path.join(model_dir, f"{name}.h5")
+        model.save(model_path)
+        for backend in backends:
+            if backend != "keras":
+                quantization = backend.split("-", 1)[1]
+                with open(tflite_model_path(model_path, quantization), "wb") as f:
+                    f.write(convert(model, quantization, calibration))
+
+def summarize(latencies, images_per_call):
+    latencies = np.asarray(latencies)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3),
+        "mean_ms": round(float(latencies.mean()) * 1000, 3),
+        "images_per_sec": round(images_per_call / float(latencies.mean()), 2)
+    }
+
+def timed(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_worker(args):
+    """Runs every backend and batch size in this process at one thread count; prints JSON lines."""
+    # Keras models follow TensorFlow's thread pools; TFLite interpreters get num_threads at load
+    if args.threads_worker:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads_worker)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    from PIL import Image
+    from inference import (
+        backend_model_path, load_model_file, predict_batch, preprocess_image,
+        decode_prediction, check_disease_prediction
+    )
+
+    rng = np.random.default_rng(0)
+    class_names = {
+        "crop_classifier": np.array(["Apple", "Corn", "Unknown"]),
+        "disease": np.array(["Apple___Apple_scab", "Apple___Black_rot", "Apple___Cedar_apple_rust", "Apple___healthy"])
+    }
+    jpeg = io.BytesIO()
+    Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)).save(jpeg, "JPEG")
+    jpeg_bytes = jpeg.getvalue()
+
+    for backend in args.backends:
+        models = {
+            name: load_model_file(backend_model_path(os.path.join(args.model_dir, f"{name}.h5"), backend),
+                                  num_threads=args.threads_worker or None)
+            for name in STANDIN_MODELS
+        }
+
+        for batch_size in args.batch_sizes:
+            batch = rng.random((batch_size,) + IMAGE_SIZE + (3,), dtype=np.float32)
+            latencies = timed(lambda: predict_batch(models["disease"], batch, batch_size), args.iterations, args.warmup)
+            result = {"scenario": "model", "backend": backend, "threads": args.threads_worker, "batch_size": batch_size}
+            print(json.dumps(result | summarize(latencies, batch_size)), flush=True)
+
+        # One Analyze request: decode + preprocess, crop classifier, disease model, post-processing
+        def pipeline():
+            img_array = preprocess_image(Image.open(io.BytesIO(jpeg_bytes)))[np.newaxis]
+            decode_prediction(models["crop_classifier"].predict(img_array, verbose=0)[0], class_names["crop_classifier"])
+            disease = decode_prediction(models["disease"].predict(img_array, verbose=0)[0], class_names["disease"])
+            check_disease_prediction(*disease, "Apple")
+
+        latencies = timed(pipeline, args.iterations, args.warmup)
+        result = {"scenario": "pipeline", "backend": backend, "threads": args.threads_worker, "batch_size": 1}
+        print(json.dumps(result | summarize(latencies, 1)), flush=True)
+
+def run_thread_count(args, threads):
+    """Runs the worker in a fresh interpreter, since TensorFlow thread pools are fixed at startup."""
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--worker",
+        "--model-dir", args.model_dir, "--threads-worker", str(threads),
+        "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+        "--batch-sizes", *map(str, args.batch_sizes), "--backends", *args.backends
+    ]
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    output = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+def metadata(args):
+    import tensorflow as tf
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "tensorflow": tf.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "architecture": args.architecture,
+        "iterations": args.iterations
+    }
+
+def compare(results, baseline_path):
+    """Prints p50 latency and throughput changes against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = {tuple(r[k] for k in RESULT_KEY): r for r in json.load(f)["results"]}
+
+    print(f"\n📊 Compared with {baseline_path}")
+    for result in results:
+        old = baseline.get(tuple(result[k] for k in RESULT_KEY))
+        if not old:
+            continue
+        p50_change = (result["p50_ms"] / old["p50_ms"] - 1) * 100
+        throughput_change = (result["images_per_sec"] / old["images_per_sec"] - 1) * 100
+        label = f"{result['scenario']}/{result['backend']}/t{result['threads']}/b{result['batch_size']}"
+        print(f"{label:<42} p50 {p50_change:+6.1f}%  throughput {throughput_change:+6.1f}%")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AgriLens disease pipeline on stand-in models.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32], help="Batch sizes (default: 1 8 32)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="Thread counts for TensorFlow intra-op and the TFLite interpreter; 0 = their defaults")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS), help="Backends (default: all)")
+    parser.add_argument("--architecture", choices=["mobilenetv2", "small"], default="mobilenetv2", help="Stand-in model architecture (default: mobilenetv2)")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed calls per measurement (default: 30)")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls before each measurement (default: 3)")
+    parser.add_argument("--output", default="bench_results.json", help="Results file (default: bench_results.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    # Internal: run one thread count in this process
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--threads-worker", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--model-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args)
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as model_dir:
+        args.model_dir = model_dir
+        print(f"🔧 Building {args.architecture} stand-in models...")
+        prepare_models(model_dir, args.architecture, args.backends)
+
+        print(f"{'scenario':<10}{'backend':<16}{'threads':>8}{'batch':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'img/s':>10}")
+        for threads in args.threads:
+            for result in run_thread_count(args, threads):
+                results.append(result)
+                print(f"{result['scenario']:<10}{result['backend']:<16}{result['threads']:>8}{result['batch_size']:>7}"
+                      f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['images_per_sec']:>10.1f}")
+
+    with open(args.output, "w") as f:
+        json.dump({"metadata": metadata(args), "results": results}, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
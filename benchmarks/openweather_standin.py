@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+AgriLens OpenWeather Stand-in
+A local HTTP server serving the /data/2.5/weather, /data/2.5/forecast,
+/geo/1.0/direct and /geo/1.0/zip JSON shapes the app parses, with synthetic
+data that is stable per location. Latency, error rate and payload size are
+configurable, so the weather paths can be load-tested without API quota or
+network.
+Call counts per endpoint are served at /_stats.
+
+Usage:
+    python benchmarks/openweather_standin.py --port 8765 --latency-ms 120 --error-rate 0.02
+    # then set OPENWEATHER_BASE_URL = "http://127.0.0.1:8765" in .streamlit/secrets.toml
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = [
+    ("Clear", "clear sky", "01d"),
+    ("Clouds", "scattered clouds", "03d"),
+    ("Clouds", "overcast clouds", "04d"),
+    ("Rain", "light rain", "10d"),
+    ("Rain", "moderate rain", "10d"),
+    ("Thunderstorm", "thunderstorm with rain", "11d")
+]
+
+def location_seed(params):
+    """A stable seed for whichever of q / zip / lat+lon / id selects the place."""
+    place = params.get("q") or params.get("zip") or params.get("id") or f"{params.get('lat')},{params.get('lon')}"
+    return int(hashlib.sha1(str(place).lower().encode()).hexdigest()[:8], 16)
+
+def current_payload(params, now):
+    rng = random.Random(location_seed(params) + now // 600) # Changes every 10 minutes
+    main, description, icon = rng.choice(CONDITIONS)
+    return {
+        "id": location_seed(params) % 10_000_000,
+        "name": str(params.get("q", "Stand-in City")).split(",")[0].title(),
+        "coord": {"lat": float(params.get("lat", 12.97)), "lon": float(params.get("lon", 77.59))},
+        "sys": {"country": "IN", "sunrise": now - 6 * 3600, "sunset": now + 6 * 3600},
+        "main": {"temp": round(rng.uniform(12, 38), 2), "feels_like": round(rng.uniform(12, 40), 2),
+                 "humidity": rng.randint(30, 98), "pressure": rng.randint(1000, 1020)},
+        "visibility": rng.choice([6000, 8000, 10000]),
+        "wind": {"speed": round(rng.uniform(0, 18), 2), "deg": rng.randint(0, 359)},
+        "weather": [{"main": main, "description": description, "icon": icon}],
+        "clouds": {"all": rng.randint(0, 100)},
+        "dt": now
+    }
+
+def forecast_payload(params, now, steps):
+    rng = random.Random(location_seed(params) + now // 3600)
+    start = now - now % 10800 + 10800
+    entries = []
+    base_temp = rng.uniform(15, 32)
+    for i in range(steps):
+        main, description, icon = rng.choice(CONDITIONS)
+        entry = {
+            "dt": start + i * 10800,
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * 10800)),
+            "main": {"temp": round(base_temp + rng.uniform(-6, 6), 2), "humidity": rng.randint(35, 100),
+                     "pressure": rng.randint(1000, 1020)},
+            "weather": [{"main": main, "description": description, "icon": icon}],
+            "wind": {"speed": round(rng.uniform(0, 17), 2)},
+            "clouds": {"all": rng.randint(0, 100)}
+        }
+        if main in ("Rain", "Thunderstorm"):
+            entry["rain"] = {"3h": round(rng.uniform(0.1, 6), 2)}
+        entries.append(entry)
+    return {"cod": "200", "cnt": steps, "list": entries, "city": {"name": str(params.get("q", "Stand-in City"))}}
+
+def geocode_payload(params):
+    query = str(params.get("q", ""))
+    if not query or query.startswith("nowhere"):
+        return []
+    seed = location_seed({"q": query.split(",")[0].strip()}) # Like the real API, "pune" and "pune,in" are one place
+    return [{"name": query.split(",")[0].title(), "lat": round(8 + seed % 2600 / 100, 4),
+             "lon": round(68 + seed // 2600 % 2700 / 100, 4), "country": "IN"}]
+
+def zip_payload(params):
+    """The place for a "code,country" postal code, or None for unknown codes (those starting with 000)."""
+    code, _, country = str(params.get("zip", "")).partition(",")
+    if not code or code.startswith("000"):
+        return None
+    seed = location_seed({"zip": code})
+    return {"zip": code, "name": f"Stand-in {code}", "lat": round(8 + seed % 2600 / 100, 4),
+            "lon": round(68 + seed // 2600 % 2700 / 100, 4), "country": (country or "in").upper()}
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, jitter_ms=0, error_rate=0.0, forecast_steps=40, pad_bytes=0):
+        super().__init__(address, StandinHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.forecast_steps = forecast_steps
+        self.pad_bytes = pad_bytes
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def stats(self):
+        with self.lock:
+            return dict(self.calls)
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+        if url.path == "/_stats":
+            return self._send(200, server.stats())
+
+        with server.lock:
+            server.calls[url.path] += 1
+        time.sleep(max(0.0, server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)) / 1000)
+        if random.random() < server.error_rate:
+            return self._send(503, {"cod": 503, "message": "stand-in injected error"})
+
+        now = int(time.time())
+        if url.path == "/data/2.5/weather":
+            payload = current_payload(params, now)
+        elif url.path == "/data/2.5/forecast":
+            payload = forecast_payload(params, now, int(params.get("cnt", server.forecast_steps)))
+        elif url.path == "/geo/1.0/direct":
+            return self._send(200, geocode_payload(params))
+        elif url.path == "/geo/1.0/zip":
+            place = zip_payload(params)
+            return self._send(200, place) if place else self._send(404, {"cod": "404", "message": "not found"})
+        else:
+            return self._send(404, {"cod": "404", "message": "not found"})
+        if server.pad_bytes:
+            payload["padding"] = "x" * server.pad_bytes # Simulates larger responses
+        self._send(200, payload)
+
+def start_server(port=0, **options):
+    """Starts a stand-in server on a background thread and returns it."""
+    server = StandinServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, name="openweather-standin", daemon=True).start()
+    return server
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=80, help="Mean response latency in ms (default: 80)")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Uniform latency jitter in ms (default: 20)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503 (default: 0)")
+    parser.add_argument("--forecast-steps", type=int, default=40, help="Entries per forecast response (default: 40, like the real API)")
+    parser.add_argument("--pad-bytes", type=int, default=0, help="Extra bytes added to every weather response (default: 0)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve OpenWeather-shaped responses locally.")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = StandinServer(
+        ("127.0.0.1", args.port), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, forecast_steps=args.forecast_steps, pad_bytes=args.pad_bytes
+    )
+    print(f"🌦️ OpenWeather stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
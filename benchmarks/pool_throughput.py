@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+AgriLens Inference Pool Throughput Benchmark
+Measures how inference throughput scales from 1 to N worker processes by
+submitting many concurrent single-image requests, the way Streamlit sessions do.
+Run from the repository root so the models/ and data/ paths resolve.
+
+Usage:
+    python benchmarks/pool_throughput.py --max-workers 4 --requests 400
+    python benchmarks/pool_throughput.py --model apple --no-pin --json pool.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import BACKENDS, IMAGE_SIZE
+from inference_pool import CROP_CLASSIFIER_KEY, InferencePool, available_cpus
+
+def run(workers, args, images):
+    """Returns images/sec for one pool size."""
+    pool = InferencePool(workers, backend=args.backend, pin_cpus=not args.no_pin)
+    try:
+        pool.start()
+        # Warm every worker's model before timing
+        for future in [pool.submit(args.model, images[:args.images_per_request]) for _ in range(workers * 2)]:
+            future.result()
+
+        start = time.perf_counter()
+        futures = [
+            pool.submit(args.model, images[i % len(images):i % len(images) + args.images_per_request])
+            for i in range(args.requests)
+        ]
+        total = sum(len(future.result()) for future in futures)
+        return total / (time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AgriLens inference throughput for 1..N worker processes.")
+    parser.add_argument("--max-workers", type=int, default=len(available_cpus()), help="Largest pool size (default: CPU count)")
+    parser.add_argument("--requests", type=int, default=200, help="Concurrent requests per pool size (default: 200)")
+    parser.add_argument("--images-per-request", type=int, default=1, help="Images per request (default: 1)")
+    parser.add_argument("--model", default=CROP_CLASSIFIER_KEY, help="Model to run: crop_classifier or a crop name (default: crop_classifier)")
+    parser.add_argument("--backend", choices=BACKENDS, default="keras", help="Model runtime (default: keras)")
+    parser.add_argument("--no-pin", action="store_true", help="Do not pin workers to CPU sets")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    images = rng.random((64,) + IMAGE_SIZE + (3,), dtype=np.float32)
+
+    print(f"🚀 {args.model} ({args.backend}), {args.requests} requests x {args.images_per_request} image(s), "
+          f"CPU pinning {'off' if args.no_pin else 'on'}")
+    print("=" * 50)
+    results = []
+    for workers in range(1, args.max_workers + 1):
+        throughput = run(workers, args, images)
+        speedup = throughput / results[0]["images_per_sec"] if results else 1.0
+        results.append({"workers": workers, "images_per_sec": round(throughput, 2), "speedup": round(speedup, 2)})
+        print(f"{workers:>3} worker(s): {throughput:>8.1f} images/sec  ({speedup:.2f}x)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+AgriLens Startup Import Report
+Measures, in fresh interpreters, how long the app's module-level imports take
+with TensorFlow deferred (current behaviour) versus imported eagerly at
+startup (previous behaviour), plus the one-off cost paid on first disease
+detection.
+
+Usage:
+    python benchmarks/startup_report.py --repeat 5
+    python benchmarks/startup_report.py --json startup.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_PATH = os.path.join(REPO_ROOT, "streamlit_app.py")
+
+def app_imports(path=APP_PATH):
+    """
+    Returns the module-level import statements of streamlit_app.py, read from
+    its source so the report keeps up as the app gains imports. Imports inside
+    a top-level try block are optional dependencies and are returned separately.
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+
+    required, optional = [], []
+    def collect(nodes, into):
+        for node in nodes:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                into.append(ast.unparse(node))
+            elif isinstance(node, ast.Try):
+                collect(node.body, optional)
+    collect(tree.body, required)
+    return required, optional
+
+# Module-level imports of streamlit_app.py that every page pays for
+APP_IMPORTS, OPTIONAL_APP_IMPORTS = app_imports()
+
+# What streamlit_app.py used to import at module top for disease detection
+VISION_IMPORTS = ["import tensorflow.keras.models", "import tensorflow.keras.preprocessing.image"]
+
+SCENARIOS = {
+    "lazy (non-vision pages)": APP_IMPORTS,
+    "eager (previous startup)": APP_IMPORTS + VISION_IMPORTS,
+}
+
+def time_imports(statements, optional=OPTIONAL_APP_IMPORTS):
+    """
+    Runs the import `statements`, then whichever `optional` ones succeed, in a
+    fresh interpreter and returns the elapsed seconds.
+    """
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"for statement in {statements!r}:\n"
+        "    exec(statement)\n"
+        f"for statement in {optional!r}:\n"
+        "    try:\n"
+        "        exec(statement)\n"
+        "    except ImportError:\n"
+        "        pass\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3", TF_ENABLE_ONEDNN_OPTS="0")
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report AgriLens startup import cost with and without eager TensorFlow.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per scenario (default: 3)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, modules in SCENARIOS.items():
+        samples = [time_imports(modules) for _ in range(args.repeat)]
+        results[name] = {"median_s": statistics.median(samples), "samples_s": samples}
+
+    lazy = results["lazy (non-vision pages)"]["median_s"]
+    eager = results["eager (previous startup)"]["median_s"]
+    results["first disease detection (deferred cost)"] = {"median_s": eager - lazy}
+
+    print("🚀 AgriLens startup import cost (median of %d runs)" % args.repeat)
+    print("=" * 50)
+    for name, result in results.items():
+        print(f"{name:<42} {result['median_s'] * 1000:>8.0f} ms")
+    print("=" * 50)
+    print(f"Non-vision pages start {eager - lazy:.2f}s faster ({eager / lazy:.1f}x)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
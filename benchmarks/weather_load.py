@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+AgriLens Weather Load Test
+Drives concurrent Weather Dashboard requests through the app's weather stack
+(pooled client, caches, location resolution, alert rules) against the local
+OpenWeather stand-in, and reports latency percentiles, cache hit rates and
+upstream call counts. Locations follow a skewed (Zipf) popularity and are
+spelled several ways, as real users type them.
+
+Usage:
+    python benchmarks/weather_load.py --sessions 32 --requests 2000 --locations 100
+    python benchmarks/weather_load.py --error-rate 0.05 --cache-db /tmp/weather.sqlite --output load.json
+    python benchmarks/weather_load.py --base-url http://127.0.0.1:8765   # an already running stand-in
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from alert_rules import evaluate_rules
+from openweather_standin import add_server_arguments, start_server
+from weather import build_weather_store
+
+CITIES = [
+    "Bengaluru", "Mysuru", "Hubballi", "Belagavi", "Mangaluru", "Pune", "Nashik", "Nagpur",
+    "Indore", "Bhopal", "Jaipur", "Ludhiana", "Amritsar", "Patna", "Lucknow", "Varanasi",
+    "Coimbatore", "Madurai", "Guntur", "Warangal"
+]
+ALIASES = {"Bengaluru": "Bangalore", "Mysuru": "Mysore", "Hubballi": "Hubli", "Belagavi": "Belgaum", "Mangaluru": "Mangalore"}
+
+def location_spellings(count):
+    """Returns `count` places, each with the different ways users type it."""
+    places = [CITIES[i] if i < len(CITIES) else f"Farm Village {i}" for i in range(count)]
+    return [
+        [place, f"{place}, India", f"{place.lower()},in", f"  {place.upper()} ", *( [ALIASES[place]] if place in ALIASES else [])]
+        for place in places
+    ]
+
+def dashboard_request(store, location):
+    """The Weather Dashboard's data path: current conditions, forecast and alerts."""
+    current = store.current(location)
+    forecast = store.forecast(location)
+    evaluate_rules({location: forecast})
+    return current is not None
+
+def upstream_stats(base_url, server):
+    if server is not None:
+        return server.stats()
+    try:
+        with urllib.request.urlopen(f"{base_url}/_stats", timeout=5) as response:
+            return json.load(response)
+    except OSError:
+        return {}
+
+def run(args):
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_server(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+            forecast_steps=args.forecast_steps, pad_bytes=args.pad_bytes
+        )
+        base_url = server.base_url
+
+    store = build_weather_store(
+        "load-test", base_url=base_url, ttl=args.ttl, cache_db=args.cache_db,
+        geocode=not args.no_geocode, retries=args.retries, history_db=args.history_db
+    )
+
+    rng = np.random.default_rng(args.seed)
+    spellings = location_spellings(args.locations)
+    popularity = 1.0 / np.arange(1, args.locations + 1) ** args.zipf
+    places = rng.choice(args.locations, size=args.requests, p=popularity / popularity.sum())
+    requests_to_send = [spellings[p][rng.integers(len(spellings[p]))] for p in places]
+
+    latencies, errors = [], 0
+    def timed_request(location):
+        start = time.perf_counter()
+        try:
+            dashboard_request(store, location)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        for seconds, error in executor.map(timed_request, requests_to_send):
+            latencies.append(seconds)
+            errors += error is not None
+    elapsed = time.perf_counter() - start
+
+    latencies = np.asarray(latencies) * 1000
+    upstream = upstream_stats(base_url, server)
+    result = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "requests": args.requests,
+        "errors": errors,
+        "requests_per_sec": round(args.requests / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+        "upstream_calls": upstream,
+        "upstream_calls_per_request": round(sum(upstream.values()) / args.requests, 3),
+        "store": store.stats(),
+        "client": store.client.stats()
+    }
+    if server is not None:
+        server.shutdown()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the AgriLens weather stack against the OpenWeather stand-in.")
+    parser.add_argument("--base-url", help="Stand-in server URL (default: start one in-process)")
+    parser.add_argument("--sessions", type=int, default=16, help="Concurrent dashboard sessions (default: 16)")
+    parser.add_argument("--requests", type=int, default=1000, help="Total dashboard requests (default: 1000)")
+    parser.add_argument("--locations", type=int, default=50, help="Distinct places (default: 50)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew of places (default: 1.1)")
+    parser.add_argument("--ttl", type=int, default=300, help="Weather cache TTL in seconds (default: 300)")
+    parser.add_argument("--cache-db", help="SQLite weather cache file (default: memory only)")
+    parser.add_argument("--history-db", help="SQLite weather history file (default: no history)")
+    parser.add_argument("--no-geocode", action="store_true", help="Key the cache by normalized name instead of geocoded place")
+    parser.add_argument("--retries", type=int, default=2, help="Client retries (default: 2)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    print(f"🌦️ {args.requests} dashboard requests, {args.sessions} sessions, {args.locations} places...")
+    result = run(args)
+
+    print(f"✅ {result['requests_per_sec']} req/s, {result['errors']} errors")
+    print(f"⏱️ p50 {result['p50_ms']} ms | p95 {result['p95_ms']} ms | p99 {result['p99_ms']} ms | max {result['max_ms']} ms")
+    print(f"📦 Cache hit rate {result['store']['hit_rate']:.1%} ({result['store']['hits']} hits, {result['store']['stale_hits']} stale)")
+    print(f"🌐 Upstream calls: {result['upstream_calls']} ({result['upstream_calls_per_request']} per request)")
+    print(f"🔌 Circuit: {result['client']['circuit']['state']} (opened {result['client']['circuit']['opens']}x)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"📄 Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+AgriLens Translation Catalog Builder
+Extracts every static string passed to translate_text() in the app source,
+plus the fixed phrases other modules hand it at runtime (alert texts and
+OpenWeather condition names, see CATALOG_CONSTANTS), and pre-translates them
+into one catalog file per language, so deployments serve the UI in Hindi and
+Kannada without live translation calls. Existing
+catalog entries are kept (hand corrections survive rebuilds); only new
+strings are translated, in batches.
+
+Usage:
+    python build_translation_catalog.py                      # translations/hi.json, translations/kn.json
+    python build_translation_catalog.py --languages hi --refresh
+    python build_translation_catalog.py --check              # exit 1 if any static string is missing
+"""
+
+import argparse
+import ast
+import re
+import sys
+
+from translation import BatchTranslator, catalog_path, load_catalogs, write_catalog
+
+DEFAULT_SOURCES = ["streamlit_app.py", "alert_rules.py", "weather.py"]
+
+# Module-level constants whose strings reach translate_text() as variables
+CATALOG_CONSTANTS = ("ALERT_TEXT", "WEATHER_CONDITIONS")
+DEFAULT_LANGUAGES = ["hi", "kn"]
+DEFAULT_CATALOG_DIR = "translations"
+
+def literal_strings(node):
+    """
+    Returns the strings a translate_text() argument can statically evaluate to:
+    a literal, either branch of a conditional, or any value of a literal dict
+    lookup such as {"day": "Daily", "week": "Weekly"}[resolution].
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.IfExp):
+        return literal_strings(node.body) + literal_strings(node.orelse)
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Dict):
+        return [text for value in node.value.values for text in literal_strings(value)]
+    return [] # f-strings, variables and data are dynamic text, translated online
+
+def constant_strings(node):
+    """Returns every string literal inside a constant's value (nested tuples, lists and dict values)."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return [text for element in node.elts for text in constant_strings(element)]
+    if isinstance(node, ast.Dict):
+        return [text for value in node.values for text in constant_strings(value)]
+    return []
+
+def extract_strings(paths, function="translate_text", constants=CATALOG_CONSTANTS):
+    """
+    Returns the static strings passed to `function` in the given source files,
+    and those in module-level `constants`, in first-seen order. Constant
+    strings with no word of three or more letters (units such as °C, mm or
+    m/s) are left out.
+    """
+    strings = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and any(getattr(target, "id", None) in constants for target in node.targets):
+                for text in constant_strings(node.value):
+                    if re.search(r"[^\W\d_]{3}", text):
+                        strings[text] = None
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and node.args):
+                continue
+            name = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, "attr", None)
+            if name == function:
+                for text in literal_strings(node.args[0]):
+                    if text.strip():
+                        strings[text] = None
+    return list(strings)
+
+def build_catalog(strings, language, existing, translator, refresh=False):
+    """Returns the catalog for `strings`: existing entries unless `refresh`, the rest translated in batches."""
+    catalog = {} if refresh else {text: existing[text] for text in strings if text in existing}
+    missing = [text for text in strings if text not in catalog]
+    if missing:
+        translated = translator.translate_many(missing, language)
+        catalog.update({text: translated[text] for text in missing})
+    return catalog
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the offline translation catalogs for the AgriLens UI.")
+    parser.add_argument("--sources", nargs="+", default=DEFAULT_SOURCES, help=f"Python files to scan (default: {' '.join(DEFAULT_SOURCES)})")
+    parser.add_argument("--languages", nargs="+", default=DEFAULT_LANGUAGES, help="Target language codes (default: hi kn)")
+    parser.add_argument("--output-dir", default=DEFAULT_CATALOG_DIR, help="Catalog directory (default: translations)")
+    parser.add_argument("--refresh", action="store_true", help="Retranslate every string instead of keeping existing entries")
+    parser.add_argument("--check", action="store_true", help="Only report strings missing from the catalogs; no network needed")
+    args = parser.parse_args(argv)
+
+    strings = extract_strings(args.sources)
+    print(f"🔍 Found {len(strings)} static strings in {', '.join(args.sources)}")
+    catalogs = load_catalogs(args.output_dir, args.languages)
+
+    if args.check:
+        missing = {language: [s for s in strings if s not in catalogs.get(language, {})] for language in args.languages}
+        for language, texts in missing.items():
+            print(f"{'✅' if not texts else '❌'} {language}: {len(strings) - len(texts)}/{len(strings)} strings catalogued")
+            for text in texts[:10]:
+                print(f"   missing: {text!r}")
+        return 1 if any(missing.values()) else 0
+
+    try:
+        from googletrans import Translator
+    except ImportError:
+        print("❌ Building catalogs needs googletrans: pip install googletrans-py")
+        return 1
+    online = Translator()
+    translator = BatchTranslator(lambda text, dest, src: online.translate(text, dest=dest, src=src).text)
+
+    for language in args.languages:
+        existing = catalogs.get(language, {})
+        try:
+            catalog = build_catalog(strings, language, existing, translator, refresh=args.refresh)
+        except Exception as e:
+            print(f"❌ {language}: translation failed: {e}")
+            return 1
+        path = catalog_path(args.output_dir, language)
+        write_catalog(path, catalog)
+        dropped = len(set(existing) - set(catalog))
+        print(f"✅ {language}: {len(catalog)} strings -> {path} ({dropped} no longer used, dropped)")
+
+    stats = translator.stats()
+    print(f"🌐 {stats['upstream_requests']} translation requests ({stats['batch_fallbacks']} batches split into single strings)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
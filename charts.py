@@ -0,0 +1,52 @@
+"""
+AgriLens chart helpers
+Content fingerprints for memoizing Plotly figures across reruns, and trace
+builders that switch long series to WebGL (Scattergl) after decimating them
+server-side, so the browser never receives more than MAX_CHART_POINTS
+points per trace.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Series longer than this are drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = 1000
+
+# Points kept per trace after decimation
+MAX_CHART_POINTS = 2000
+
+def frame_fingerprint(frame):
+    """Returns a short hash of a DataFrame's columns and values; equal data gives an equal fingerprint."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join(map(str, frame.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def decimate(x, y, max_points=MAX_CHART_POINTS):
+    """
+    Min/max decimation: splits the series into max_points / 2 buckets and
+    keeps the lowest and highest point of each, in order, so peaks such as
+    heat spikes or storms survive the reduction.
+    """
+    values = np.asarray(y, dtype=np.float64)
+    if len(values) <= max_points:
+        return x, y
+    buckets = max(1, max_points // 2)
+    bucket_ids = np.repeat(np.arange(buckets), np.diff(np.linspace(0, len(values), buckets + 1).astype(int)))
+    starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+    ends = np.r_[starts[1:], len(values)] - 1
+    # Sorted by (bucket, value): each bucket's first entry is its minimum and its last the maximum
+    by_min = np.lexsort((np.where(np.isnan(values), np.inf, values), bucket_ids))
+    by_max = np.lexsort((np.where(np.isnan(values), -np.inf, values), bucket_ids))
+    keep = np.unique(np.concatenate([by_min[starts], by_max[ends]]))
+    return np.asarray(x)[keep], values[keep]
+
+def line_trace(x, y, **kwargs):
+    """Returns a go.Scatter, or a decimated go.Scattergl for series longer than WEBGL_THRESHOLD."""
+    if len(y) > WEBGL_THRESHOLD:
+        x, y = decimate(x, y)
+        return go.Scattergl(x=x, y=y, **kwargs)
+    return go.Scatter(x=x, y=y, **kwargs)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+AgriLens TFLite Export
+Converts the Keras disease and crop classifier models to float16 and INT8
+TFLite files for the CPU runtime backend, then compares each export against
+its Keras model so the quantized model can be accepted or rejected.
+
+Usage:
+    python export_tflite.py --calibration calibration_images/
+    python export_tflite.py --calibration calib/ --eval labelled_eval/ --quantization int8
+
+The eval directory may contain one sub-folder per class (named exactly as in
+the class-name files); accuracy is then reported for both models as well as
+their top-1 agreement.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+from batch_predict import collect_image_paths
+from inference import (
+    CROP_CLASSIFIER_MODEL_PATH, CROP_CLASSIFIER_CLASSES_PATH, TFLiteModel,
+    disease_model_paths, tflite_model_path, load_image_array, predict_batch
+)
+
+QUANTIZATIONS = ("float16", "int8")
+
+# Keras model -> class names file for every model served by the app
+EXPORT_MODELS = dict([
+    disease_model_paths("apple"),
+    disease_model_paths("corn"),
+    (CROP_CLASSIFIER_MODEL_PATH, CROP_CLASSIFIER_CLASSES_PATH)
+])
+
+def load_images(paths):
+    """
+    Loads image paths into one (N, 224, 224, 3) array, skipping unreadable
+    files. Returns the array and the paths that were loaded, row for row.
+    """
+    arrays, loaded = [], []
+    for path in paths:
+        try:
+            arrays.append(load_image_array(path))
+            loaded.append(path)
+        except Exception as e:
+            print(f"   ⚠️ Skipping {path}: {e}")
+    images = np.stack(arrays) if arrays else np.empty((0, 224, 224, 3), dtype=np.float32)
+    return images, loaded
+
+def convert(model, quantization, calibration):
+    """Converts a Keras model to TFLite bytes with float16 or full-integer INT8 weights."""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        def representative_dataset():
+            for img_array in calibration:
+                yield [img_array[np.newaxis]]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    return converter.convert()
+
+def compare(keras_model, tflite_model, images, labels, class_names, batch_size=32):
+    """
+    Runs both models over the eval images and returns top-1 agreement, mean
+    absolute probability difference and, for labelled images, both accuracies.
+    `labels` holds one label per image row.
+    """
+    if not len(images):
+        raise ValueError("No eval images to compare the models on")
+    if len(labels) != len(images):
+        raise ValueError(f"Got {len(labels)} labels for {len(images)} eval images")
+    keras_probs = predict_batch(keras_model, images, batch_size)
+    tflite_probs = np.concatenate([
+        tflite_model.predict(images[i:i + batch_size]) for i in range(0, len(images), batch_size)
+    ])
+
+    keras_top1 = np.argmax(keras_probs, axis=1)
+    tflite_top1 = np.argmax(tflite_probs, axis=1)
+    report = {
+        "agreement": float(np.mean(keras_top1 == tflite_top1)),
+        "mean_abs_diff": float(np.mean(np.abs(keras_probs - tflite_probs)))
+    }
+
+    class_index = {str(name): i for i, name in enumerate(class_names)}
+    labelled = [(i, class_index[label]) for i, label in enumerate(labels) if label in class_index]
+    if labelled:
+        rows, targets = map(np.array, zip(*labelled))
+        report["keras_accuracy"] = float(np.mean(keras_top1[rows] == targets))
+        report["tflite_accuracy"] = float(np.mean(tflite_top1[rows] == targets))
+        report["accuracy_delta"] = report["tflite_accuracy"] - report["keras_accuracy"]
+        report["labelled_images"] = len(labelled)
+
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export AgriLens models to float16/INT8 TFLite and compare them with Keras.")
+    parser.add_argument("--calibration", required=True, help="Image directory or manifest used to calibrate INT8 quantization")
+    parser.add_argument("--eval", help="Image directory or manifest to compare models on (default: the calibration set)")
+    parser.add_argument("--quantization", nargs="+", choices=QUANTIZATIONS, default=list(QUANTIZATIONS), help="Quantization modes to export (default: both)")
+    parser.add_argument("--models", nargs="+", default=list(EXPORT_MODELS), help="Keras models to export (default: all served models)")
+    parser.add_argument("--calibration-samples", type=int, default=200, help="Maximum calibration images (default: 200)")
+    parser.add_argument("--min-agreement", type=float, default=0.98, help="Minimum top-1 agreement with Keras to accept an export (default: 0.98)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01, help="Maximum accuracy drop on labelled images to accept an export (default: 0.01)")
+    args = parser.parse_args(argv)
+
+    calibration, _ = load_images(collect_image_paths(args.calibration)[:args.calibration_samples])
+    if not len(calibration):
+        print(f"❌ No calibration images found in {args.calibration}")
+        return 1
+
+    eval_paths = collect_image_paths(args.eval) if args.eval else collect_image_paths(args.calibration)
+    if not args.eval:
+        print("⚠️ No --eval set given; comparing on the calibration images.")
+    eval_images, eval_paths = load_images(eval_paths)
+    if not len(eval_images):
+        print(f"❌ No readable eval images found in {args.eval or args.calibration}")
+        return 1
+    # Labels come from the images actually loaded, so a skipped file cannot shift them
+    eval_labels = [os.path.basename(os.path.dirname(path)) for path in eval_paths]
+
+    rejected = []
+    for model_path in args.models:
+        class_path = EXPORT_MODELS.get(model_path)
+        if not os.path.exists(model_path) or not class_path or not os.path.exists(class_path):
+            print(f"❌ Skipping {model_path}: model or class names file not found")
+            rejected.append(model_path)
+            continue
+
+        print(f"\n🔧 {model_path} ({os.path.getsize(model_path) / 1e6:.1f} MB)")
+        keras_model = tf.keras.models.load_model(model_path)
+        class_names = np.load(class_path, allow_pickle=True)
+
+        for quantization in args.quantization:
+            out_path = tflite_model_path(model_path, quantization)
+            with open(out_path, "wb") as f:
+                f.write(convert(keras_model, quantization, calibration))
+
+            report = compare(keras_model, TFLiteModel(out_path), eval_images, eval_labels, class_names)
+            accepted = report["agreement"] >= args.min_agreement
+            if "accuracy_delta" in report:
+                accepted = accepted and report["accuracy_delta"] >= -args.max_accuracy_drop
+
+            print(f"   {'✅' if accepted else '❌'} {quantization}: {out_path} ({os.path.getsize(out_path) / 1e6:.1f} MB)")
+            print(f"      top-1 agreement: {report['agreement']:.2%}, mean |Δp|: {report['mean_abs_diff']:.4f}")
+            if "accuracy_delta" in report:
+                print(f"      accuracy on {report['labelled_images']} labelled images: "
+                      f"keras {report['keras_accuracy']:.2%}, tflite {report['tflite_accuracy']:.2%} "
+                      f"(Δ {report['accuracy_delta']:+.2%})")
+            if not accepted:
+                rejected.append(out_path)
+
+    print("=" * 50)
+    if rejected:
+        print(f"❌ Rejected: {rejected}")
+        return 1
+    print("✅ All exports accepted. Set INFERENCE_BACKEND to 'tflite-int8' or 'tflite-float16' to serve them.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+AgriLens inference helpers
+Image preprocessing, model loading and prediction post-processing shared by the
+Streamlit app and the headless batch tools.
+
+TensorFlow is imported on first model load (or by `warm_vision_stack`), so
+importing this module stays cheap for pages that never run a model.
+"""
+
+import gc
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+IMAGE_SIZE = (224, 224)
+CONFIDENCE_THRESHOLD = 60.0
+
+CROP_CLASSIFIER_MODEL_PATH = "models/crop_classifier_apple_corn_unknown.h5"
+CROP_CLASSIFIER_CLASSES_PATH = "data/crop_classifier_classes.npy"
+
+# Inference backends: the original Keras graphs, or TFLite exports made by export_tflite.py
+BACKENDS = ("keras", "tflite-float16", "tflite-int8")
+
+# Maps a crop name to the prefix its disease model uses for class names
+CROP_NAME_MAPPING = {
+    "apple": "Apple",
+    "corn": "Corn_(maize)",
+    "grape": "Grape",
+    "potato": "Potato",
+    "tomato": "Tomato"
+}
+
+def disease_model_paths(crop):
+    """Returns the (model_path, class_path) pair for a crop disease model."""
+    return f"models/{crop.lower()}_model.h5", f"data/{crop.lower()}_class_names.npy"
+
+def import_vision_stack():
+    """Imports TensorFlow/Keras on first use and returns the Keras `load_model` function."""
+    from tensorflow.keras.models import load_model
+    return load_model
+
+def warm_vision_stack():
+    """Starts importing the vision stack in a background thread and returns the thread."""
+    thread = threading.Thread(target=import_vision_stack, name="vision-stack-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def get_tflite_interpreter_class():
+    """
+    Returns a TFLite interpreter class, preferring a standalone LiteRT/TFLite
+    runtime on CPU-only nodes and falling back to TensorFlow's copy.
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+def tflite_model_path(model_path, quantization):
+    """Returns where export_tflite.py writes a model, e.g. models/apple_model_int8.tflite."""
+    return f"{os.path.splitext(model_path)[0]}_{quantization}.tflite"
+
+def backend_model_path(model_path, backend="keras"):
+    """Returns the file a backend loads for the given Keras model path."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    if backend == "keras":
+        return model_path
+    return tflite_model_path(model_path, backend.split("-", 1)[1])
+
+class TFLiteModel:
+    """
+    Wraps a TFLite interpreter behind the `model.predict(batch)` interface of a
+    Keras model, handling quantized inputs/outputs and variable batch sizes.
+    num_threads sets the interpreter's own thread pool, which TensorFlow's
+    threading config does not reach; None keeps the interpreter default.
+    """
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = get_tflite_interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self.input_details["shape"][0])
+        self._lock = threading.Lock() # Interpreters are not thread-safe
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            shape = [batch_size] + list(self.input_details["shape"][1:])
+            self.interpreter.resize_tensor_input(self.input_details["index"], shape)
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch_size
+
+    def _quantize(self, batch):
+        dtype = self.input_details["dtype"]
+        scale, zero_point = self.input_details["quantization"]
+        if dtype == np.float32 or not scale:
+            return batch.astype(dtype)
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def _dequantize(self, output):
+        scale, zero_point = self.output_details["quantization"]
+        if output.dtype == np.float32 or not scale:
+            return output.astype(np.float32)
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def predict(self, batch, batch_size=None, verbose=0):
+        """Runs the interpreter over a (N, 224, 224, 3) batch."""
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(len(batch))
+            self.interpreter.set_tensor(self.input_details["index"], self._quantize(batch))
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.output_details["index"])
+        return self._dequantize(output)
+
+def load_model_file(path, num_threads=None):
+    """
+    Loads a .tflite file with the TFLite interpreter and anything else with Keras.
+    num_threads only applies to TFLite; Keras follows tf.config.threading.
+    """
+    if path.endswith(".tflite"):
+        return TFLiteModel(path, num_threads)
+    return import_vision_stack()(path)
+
+def load_disease_class_names(crop):
+    """Loads the class names of a crop disease model. Raises FileNotFoundError if missing."""
+    _, class_path = disease_model_paths(crop)
+    if not os.path.exists(class_path):
+        raise FileNotFoundError(f"Disease class names not found for {crop}: {class_path}")
+    return np.load(class_path, allow_pickle=True)
+
+def load_disease_model(crop, backend="keras"):
+    """
+    Loads the model and class names for a specific crop disease model.
+    Raises FileNotFoundError if either file is missing.
+    """
+    model_path = backend_model_path(disease_model_paths(crop)[0], backend)
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Disease model not found for {crop}: {model_path}")
+    class_names = load_disease_class_names(crop)
+
+    return load_model_file(model_path), class_names
+
+def disease_model_size(crop, backend="keras"):
+    """Returns the size in bytes of the file a backend loads for a crop, or 0 if it is missing."""
+    model_path = backend_model_path(disease_model_paths(crop)[0], backend)
+    return os.path.getsize(model_path) if os.path.exists(model_path) else 0
+
+def release_model_memory(backend="keras"):
+    """
+    Frees the memory of models that are no longer referenced. Keras also keeps
+    global graph state for every model it has built until clear_session(),
+    which is only safe where no other thread can be predicting, such as a
+    single-threaded inference worker process.
+    """
+    gc.collect()
+    if backend == "keras":
+        import tensorflow as tf
+        tf.keras.backend.clear_session()
+
+def load_crop_classifier_class_names(backend="keras"):
+    """
+    Loads the crop classifier's class names without loading the model.
+    Returns None if the model or class names file is not found.
+    """
+    model_path = backend_model_path(CROP_CLASSIFIER_MODEL_PATH, backend)
+    if not os.path.exists(model_path) or not os.path.exists(CROP_CLASSIFIER_CLASSES_PATH):
+        return None
+    return np.load(CROP_CLASSIFIER_CLASSES_PATH, allow_pickle=True)
+
+def load_crop_classifier_model(backend="keras"):
+    """
+    Loads the general crop classifier model and its class names.
+    Returns (None, None) if the model is not found.
+    """
+    model_path = backend_model_path(CROP_CLASSIFIER_MODEL_PATH, backend)
+    if not os.path.exists(model_path) or not os.path.exists(CROP_CLASSIFIER_CLASSES_PATH):
+        return None, None
+
+    return load_model_file(model_path), np.load(CROP_CLASSIFIER_CLASSES_PATH, allow_pickle=True)
+
+def preprocess_image(img):
+    """
+    Converts a PIL image to the normalized (224, 224, 3) float32 array both
+    models expect. Uses nearest-neighbour resizing to match keras `load_img`.
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != IMAGE_SIZE:
+        img = img.resize(IMAGE_SIZE, Image.NEAREST)
+    img_array = np.asarray(img, dtype=np.float32)
+    return img_array / np.float32(255.0) # Normalize pixel values
+
+def load_image_array(image_path):
+    """Loads an image file as a normalized (224, 224, 3) float32 array."""
+    with Image.open(image_path) as img:
+        return preprocess_image(img)
+
+def predict_batch(model, batch, batch_size=32):
+    """Runs a model over a (N, 224, 224, 3) batch and returns the (N, classes) probabilities."""
+    return model.predict(batch, batch_size=batch_size, verbose=0)
+
+def warm_up_model(model, batch_size=1):
+    """
+    Runs a dummy all-zeros batch through a model so graph tracing and memory
+    allocation happen before the first real request.
+    """
+    dummy = np.zeros((batch_size,) + IMAGE_SIZE + (3,), dtype=np.float32)
+    return predict_batch(model, dummy, batch_size)
+
+def timed_warm_up(load):
+    """
+    Loads a model with `load()` and runs a dummy batch through it. Returns
+    (model, {"load_s": ..., "first_inference_s": ...}); `model` may be None.
+    """
+    start = time.perf_counter()
+    model = load()
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    if model is not None:
+        warm_up_model(model)
+    return model, {"load_s": round(load_s, 3), "first_inference_s": round(time.perf_counter() - start, 3)}
+
+def warm_up_crops(classifier_classes=None):
+    """Returns the crops whose disease models are warmed at startup: the classifier's crops, or Apple and Corn without it."""
+    if classifier_classes is None:
+        return ["Apple", "Corn"]
+    return [str(c) for c in classifier_classes if str(c).lower() != "unknown"]
+
+def decode_prediction(probabilities, class_names):
+    """Returns the (predicted_class, confidence %) pair for one row of probabilities."""
+    predicted_index = np.argmax(probabilities)
+    predicted_class = class_names[predicted_index]
+    confidence = round(float(np.max(probabilities)) * 100, 2)
+    return predicted_class, confidence
+
+def check_disease_prediction(predicted_class, confidence, selected_crop):
+    """
+    Rejects disease predictions that belong to another crop or fall below the
+    confidence threshold, returning ("Incompatible Image", 0.0) in that case.
+    """
+    expected_prefix = CROP_NAME_MAPPING.get(selected_crop.lower())
+
+    if not expected_prefix or not predicted_class.startswith(expected_prefix):
+        return "Incompatible Image", 0.0
+
+    if confidence < CONFIDENCE_THRESHOLD:
+        return "Incompatible Image", 0.0
+
+    return predicted_class, confidence
@@ -0,0 +1,149 @@
+"""
+AgriLens inference worker pool
+A pool of worker processes that each hold the crop classifier and a registry
+of crop disease models, so inference runs on all CPU cores instead of inside
+the Streamlit script thread. Workers can be pinned to disjoint CPU sets.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from inference import (
+    load_crop_classifier_model, load_crop_classifier_class_names, load_disease_model, predict_batch,
+    timed_warm_up, warm_up_crops, disease_model_size, release_model_memory
+)
+from model_registry import ModelRegistry
+
+CROP_CLASSIFIER_KEY = "crop_classifier"
+
+# Per-process state, populated by _init_worker in each worker
+_worker_state = {}
+
+def available_cpus():
+    """Returns the CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def split_cpus(workers, cpus=None):
+    """Splits the available CPUs into `workers` disjoint sets (round-robin)."""
+    cpus = cpus or available_cpus()
+    return [cpus[i::workers] or cpus for i in range(workers)]
+
+def _init_worker(backend, model_budget_mb, cpu_sets, counter, ready):
+    """
+    Pins the worker to its CPU set, sizes TensorFlow's thread pools to match,
+    then loads and warms the crop classifier and every disease model, and
+    reports (index, pid, {model: timings}) on the `ready` queue.
+    """
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    if cpu_sets and hasattr(os, "sched_setaffinity"):
+        cpus = cpu_sets[index % len(cpu_sets)]
+        os.sched_setaffinity(0, cpus)
+        if backend == "keras":
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(len(cpus))
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    timings = {}
+    classifier, timings[CROP_CLASSIFIER_KEY] = timed_warm_up(lambda: load_crop_classifier_model(backend)[0])
+    # A worker runs one task at a time, so evictions can safely clear Keras' session
+    registry = ModelRegistry(
+        lambda crop: load_disease_model(crop, backend),
+        budget_mb=model_budget_mb,
+        size_hint=lambda crop: disease_model_size(crop, backend),
+        release=lambda: release_model_memory(backend)
+    )
+    for crop in warm_up_crops(load_crop_classifier_class_names(backend) if classifier is not None else None):
+        try:
+            _, timings[crop.lower()] = timed_warm_up(lambda: registry.get(crop)[0])
+        except FileNotFoundError:
+            continue
+    _worker_state["classifier"] = classifier
+    _worker_state["registry"] = registry
+    ready.put((index, os.getpid(), timings))
+
+def _predict_task(model_key, batch):
+    """Runs one batch through a worker's model and returns the probabilities."""
+    if model_key == CROP_CLASSIFIER_KEY:
+        model = _worker_state["classifier"]
+        if model is None:
+            raise FileNotFoundError("Crop classifier model not found in inference worker")
+    else:
+        model, _ = _worker_state["registry"].get(model_key)
+    return predict_batch(model, batch, len(batch))
+
+def _ping_task():
+    return os.getpid()
+
+class InferencePool:
+    """
+    Process pool running model inference. `pin_cpus` gives each worker its own
+    slice of the available CPUs; workers start with spawn, since TensorFlow is
+    not fork-safe. `model_budget_mb` is the total for the pool and is split
+    evenly between the workers' model registries.
+    """
+    def __init__(self, workers=2, backend="keras", pin_cpus=True, model_budget_mb=2048):
+        self.workers = workers
+        self.backend = backend
+        self.cpu_sets = split_cpus(workers) if pin_cpus else None
+        self.warmup = {} # worker index -> {"pid": ..., "models": {model: timings}}
+        context = multiprocessing.get_context("spawn")
+        self._ready = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(backend, model_budget_mb / workers, self.cpu_sets, context.Value("i", 0), self._ready)
+        )
+
+    def start(self, timeout=600):
+        """
+        Starts every worker and waits until all have loaded and warmed their
+        models. Returns self.warmup; raises TimeoutError if some worker is not
+        ready within `timeout` seconds.
+        """
+        # Each submit to a busy pool spawns another worker, up to `workers`
+        pings = [self._executor.submit(_ping_task) for _ in range(self.workers)]
+        deadline = time.monotonic() + timeout
+        while len(self.warmup) < self.workers:
+            for ping in pings:
+                if ping.done() and ping.exception() is not None:
+                    raise ping.exception() # A worker failed to initialize
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Only {len(self.warmup)} of {self.workers} inference workers ready after {timeout}s")
+            try:
+                index, pid, timings = self._ready.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.warmup[index] = {"pid": pid, "models": timings}
+        return self.warmup
+
+    def submit(self, model_key, batch):
+        """Queues a (N, 224, 224, 3) batch for a model and returns a Future of its probabilities."""
+        return self._executor.submit(_predict_task, model_key, batch)
+
+    def predict(self, model_key, batch, timeout=None):
+        return self.submit(model_key, batch).result(timeout=timeout)
+
+    def model(self, model_key):
+        """Returns a stand-in with `model.predict(batch)` that runs the named model in the pool."""
+        return PoolModel(self, model_key)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+class PoolModel:
+    """Keras-compatible `predict` that sends the batch to an InferencePool."""
+    def __init__(self, pool, model_key):
+        self.pool = pool
+        self.model_key = model_key
+
+    def predict(self, batch, batch_size=None, verbose=0):
+        return self.pool.predict(self.model_key, batch)
@@ -6,9 +6,25 @@ Comprehensive smart farming assistant with AI-powered features
 
 import os
 import sys
+import json
+import time
 import subprocess
 import platform
 
+REQUIRED_FILES = [
+    "models/apple_model.h5",
+    "models/corn_model.h5", 
+    "models/crop_classifier_apple_corn_unknown.h5",
+    "models/crop_recommendation_model.pkl",
+    "data/apple_class_names.npy",
+    "data/corn_class_names.npy",
+    "data/crop_classifier_classes.npy",
+    "data/class_names.npy"
+]
+
+STREAMLIT_PORT = 8501
+READINESS_FILE = "logs/agrilens_ready.json"
+
 def check_dependencies():
     """Check if all required dependencies are installed"""
     try:
@@ -32,19 +48,8 @@ def check_dependencies():
 
 def check_models():
     """Check if all required model files exist"""
-    required_files = [
-        "models/apple_model.h5",
-        "models/corn_model.h5", 
-        "models/crop_classifier_apple_corn_unknown.h5",
-        "models/crop_recommendation_model.pkl",
-        "data/apple_class_names.npy",
-        "data/corn_class_names.npy",
-        "data/crop_classifier_classes.npy",
-        "data/class_names.npy"
-    ]
-    
     missing_files = []
-    for file_path in required_files:
+    for file_path in REQUIRED_FILES:
         if not os.path.exists(file_path):
             missing_files.append(file_path)
     
@@ -75,6 +80,39 @@ def check_api_keys():
         print(f"❌ Error reading secrets file: {e}")
         return False
 
+def wait_until_ready(process, port=STREAMLIT_PORT, timeout=600):
+    """
+    Wait until the Streamlit server has warmed its models. Streamlit only runs
+    the app script when a session starts, so once the server is up this runs it
+    once through the script health check endpoint; that run starts the model
+    warm-up, which writes READINESS_FILE when every model is loaded.
+    Returns the readiness record, or None on timeout or if the server exits.
+    """
+    import requests
+
+    deadline = time.monotonic() + timeout
+    triggered = False
+    while time.monotonic() < deadline and process.poll() is None:
+        if os.path.exists(READINESS_FILE):
+            with open(READINESS_FILE) as f:
+                return json.load(f)
+        if not triggered:
+            try:
+                if requests.get(f"http://localhost:{port}/_stcore/health", timeout=2).ok:
+                    response = requests.get(f"http://localhost:{port}/_stcore/script-health-check", timeout=60)
+                    if not response.ok:
+                        print(f"⚠️ App script check failed: {response.text}")
+                    triggered = True
+            except requests.exceptions.RequestException:
+                pass
+        time.sleep(0.5)
+    return None
+
+def clear_ready():
+    """Remove the readiness file so health checks fail until the app is warm again"""
+    if os.path.exists(READINESS_FILE):
+        os.remove(READINESS_FILE)
+
 def launch_application():
     """Launch the AgriLens Streamlit application"""
     print("\n🚀 Launching AgriLens Application...")
@@ -92,19 +130,40 @@ def launch_application():
     if not check_api_keys():
         return False
     
+    clear_ready()
+    
     print("\n🎉 All checks passed! Starting AgriLens...")
     print("=" * 50)
     
-    # Launch Streamlit app
+    # Launch Streamlit app; AGRILENS_WARMUP makes it warm its own cached models on startup
+    # and write READINESS_FILE once they are loaded
+    env = dict(os.environ, AGRILENS_WARMUP="1", AGRILENS_READY_FILE=READINESS_FILE)
+    streamlit_args = ["-m", "streamlit", "run", "streamlit_app.py", "--server.scriptHealthCheckEnabled=true"]
     try:
         if platform.system() == "Windows":
-            subprocess.run([sys.executable, "-m", "streamlit", "run", "streamlit_app.py"])
+            process = subprocess.Popen([sys.executable, *streamlit_args], env=env)
         else:
-            subprocess.run(["python", "-m", "streamlit", "run", "streamlit_app.py"])
-        return True
+            process = subprocess.Popen(["python", *streamlit_args], env=env)
     except Exception as e:
         print(f"❌ Error launching application: {e}")
         return False
+    
+    try:
+        print("🔥 Warming up models...")
+        readiness = wait_until_ready(process)
+        if readiness:
+            for model, timings in readiness["models"].items():
+                print(f"   {model}: load {timings['load_s'] * 1000:.0f} ms, first inference {timings.get('first_inference_s', 0) * 1000:.0f} ms")
+            print(f"✅ AgriLens is ready (readiness file: {READINESS_FILE})")
+        else:
+            print("❌ AgriLens did not finish warming up its models")
+        process.wait()
+    except KeyboardInterrupt:
+        process.terminate()
+        process.wait()
+    finally:
+        clear_ready()
+    return True
 
 if __name__ == "__main__":
     print("🌾 Welcome to AgriLens - Smart Farming Assistant")
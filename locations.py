@@ -0,0 +1,243 @@
+"""
+AgriLens location resolution
+Canonicalizes free-text locations so equivalent inputs ("Bangalore, India",
+"bangalore,india", "Bengaluru") share one weather cache entry. Places are
+geocoded once to coordinates, kept in a persistent geocode cache, and
+weather is then queried by lat/lon (or by OpenWeather city ID, written
+"id:1277333"). Bare numbers are postal codes, read as Indian PIN codes
+unless a country code follows ("560001" or "10001, US").
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import closing, contextmanager
+
+import requests
+
+# Former and alternate city names, mapped to the name OpenWeather geocodes best
+CITY_ALIASES = {
+    "bangalore": "bengaluru",
+    "bombay": "mumbai",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "mysore": "mysuru",
+    "poona": "pune",
+    "gurgaon": "gurugram",
+    "trivandrum": "thiruvananthapuram",
+    "belgaum": "belagavi",
+    "mangalore": "mangaluru",
+    "hubli": "hubballi",
+    "shimoga": "shivamogga",
+    "gulbarga": "kalaburagi",
+    "baroda": "vadodara",
+    "benares": "varanasi",
+    "cochin": "kochi",
+    "allahabad": "prayagraj"
+}
+
+# OpenWeather expects ISO 3166 country codes
+COUNTRY_CODES = {
+    "india": "in", "bharat": "in",
+    "nepal": "np", "bangladesh": "bd", "sri lanka": "lk", "pakistan": "pk",
+    "united states": "us", "usa": "us",
+    "united kingdom": "gb", "uk": "gb",
+    "kenya": "ke", "nigeria": "ng", "australia": "au", "canada": "ca"
+}
+
+COORDINATES = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+CITY_ID = re.compile(r"^\s*id:(\d{5,9})\s*$")
+POSTAL_CODE = re.compile(r"^\s*(\d{3,10})\s*(?:,\s*([a-z]{2}))?\s*$", re.IGNORECASE)
+
+# Country assumed for a postal code given without one
+DEFAULT_POSTAL_COUNTRY = "in"
+
+# Coordinates are rounded to ~1 km, so nearby farms share entries
+COORDINATE_DECIMALS = 2
+
+ResolvedLocation = namedtuple("ResolvedLocation", ["key", "name", "params"])
+
+def normalize_query(location):
+    """Returns a canonical "city[,state][,country code]" string for free-text input."""
+    parts = [" ".join(part.split()) for part in location.lower().split(",")]
+    parts = [part for part in parts if part]
+    if not parts:
+        return ""
+    parts[0] = CITY_ALIASES.get(parts[0], parts[0])
+    if len(parts) > 1:
+        parts[-1] = COUNTRY_CODES.get(parts[-1], parts[-1])
+    return ",".join(parts)
+
+def coordinate_location(lat, lon, name=None):
+    lat, lon = round(float(lat), COORDINATE_DECIMALS), round(float(lon), COORDINATE_DECIMALS)
+    return ResolvedLocation(f"{lat:.{COORDINATE_DECIMALS}f},{lon:.{COORDINATE_DECIMALS}f}", name or f"{lat}, {lon}", {"lat": lat, "lon": lon})
+
+def query_location(query):
+    """Falls back to OpenWeather's own name lookup when a place cannot be geocoded here."""
+    return ResolvedLocation(f"q:{query}", query, {"q": query})
+
+def postal_query(location):
+    """Returns "code,country" for postal code input such as "560001" or "10001, US", else None."""
+    match = POSTAL_CODE.match(location)
+    if not match:
+        return None
+    return f"{match.group(1)},{(match.group(2) or DEFAULT_POSTAL_COUNTRY).lower()}"
+
+def direct_location(location):
+    """Returns the ResolvedLocation that queries OpenWeather by city ID, postal code or name, without geocoding."""
+    match = CITY_ID.match(location)
+    if match:
+        return ResolvedLocation(f"id:{match.group(1)}", location.strip(), {"id": match.group(1)})
+    postal = postal_query(location)
+    if postal:
+        return ResolvedLocation(f"zip:{postal}", postal.upper(), {"zip": postal})
+    return query_location(normalize_query(location))
+
+class LocationResolver:
+    """
+    Resolves user input to a ResolvedLocation whose `key` is shared by every
+    equivalent spelling and whose `params` select the place in OpenWeather
+    queries. Geocoding results are kept in memory and, with `db_path`, in a
+    SQLite table that survives restarts and is shared by worker processes.
+    At most `max_entries` queries are kept in memory, least recently used
+    first out. Places that do not exist are remembered for `not_found_ttl`
+    seconds, so repeated lookups of them do not reach the upstream.
+    """
+    def __init__(self, client, db_path=None, max_entries=4096, not_found_ttl=600):
+        self.client = client
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.not_found_ttl = not_found_ttl
+        self._memory = OrderedDict() # query -> ResolvedLocation, least recent first
+        self._not_found = OrderedDict() # query -> time.monotonic() until which it is known not to exist
+        self._lock = threading.Lock()
+        self._resolve_locks = {}
+        self._lookups = 0
+        self._geocodes = 0
+        self._fallbacks = 0
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS geocode ("
+                    "query TEXT PRIMARY KEY, name TEXT NOT NULL, lat REAL NOT NULL, lon REAL NOT NULL, "
+                    "resolved_at REAL NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self):
+        """Yields a connection inside a transaction, then closes it (sqlite3's own `with` only commits)."""
+        with closing(sqlite3.connect(self.db_path, timeout=10)) as conn, conn:
+            yield conn
+
+    def _known(self, query):
+        """
+        Returns the remembered ResolvedLocation for a query, or None. Raises
+        ValueError for a place recently found not to exist. Call with the lock held.
+        """
+        resolved = self._memory.get(query)
+        if resolved is not None:
+            self._memory.move_to_end(query)
+            return resolved
+        if self._not_found.get(query, 0) > time.monotonic():
+            raise ValueError(f"Location not found: {query}")
+        return None
+
+    def _remember(self, cache, query, value):
+        """Adds an entry to `cache`, evicting the least recently used beyond max_entries. Call with the lock held."""
+        cache[query] = value
+        cache.move_to_end(query)
+        while len(cache) > self.max_entries:
+            evicted, _ = cache.popitem(last=False)
+            lock = self._resolve_locks.get(evicted)
+            if lock is not None and not lock.locked() and evicted not in self._memory:
+                del self._resolve_locks[evicted]
+
+    def _stored(self, query):
+        if not self.db_path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT name, lat, lon FROM geocode WHERE query = ?", (query,)).fetchone()
+        return coordinate_location(row[1], row[2], row[0]) if row else None
+
+    def _store(self, query, name, lat, lon):
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocode (query, name, lat, lon, resolved_at) VALUES (?, ?, ?, ?, ?)",
+                    (query, name, lat, lon, time.time())
+                )
+
+    def _geocode(self, query):
+        """Looks a place up with the OpenWeather geocoding API; raises ValueError if it does not exist."""
+        if query.startswith("zip:"):
+            try:
+                results = [self.client.get_json("geo/1.0/zip", {"zip": query[len("zip:"):]})]
+            except requests.exceptions.HTTPError as e:
+                if getattr(e.response, "status_code", None) != 404:
+                    raise
+                results = [] # Unknown postal code
+        else:
+            results = self.client.get_json("geo/1.0/direct", {"q": query, "limit": 1})
+        with self._lock:
+            self._geocodes += 1
+        if not results:
+            raise ValueError(f"Location not found: {query}")
+        place = results[0]
+        name = ", ".join(part for part in (place.get("name"), place.get("state"), place.get("country")) if part)
+        self._store(query, name, place["lat"], place["lon"])
+        return coordinate_location(place["lat"], place["lon"], name)
+
+    def resolve(self, location):
+        """Returns the ResolvedLocation for free-text input, a postal code, a "lat, lon" pair or a city ID."""
+        match = COORDINATES.match(location)
+        if match:
+            return coordinate_location(*match.groups())
+        if CITY_ID.match(location):
+            return direct_location(location)
+
+        postal = postal_query(location)
+        query = f"zip:{postal}" if postal else normalize_query(location)
+        with self._lock:
+            self._lookups += 1
+            resolved = self._known(query)
+            if resolved is not None:
+                return resolved
+            if query not in self._resolve_locks and len(self._resolve_locks) >= self.max_entries:
+                # Drop idle locks of queries that are no longer remembered
+                for idle in [q for q, lock in self._resolve_locks.items() if q not in self._memory and not lock.locked()]:
+                    del self._resolve_locks[idle]
+            resolve_lock = self._resolve_locks.setdefault(query, threading.Lock())
+
+        # Only one thread geocodes a given query; others wait and then reuse it
+        with resolve_lock:
+            with self._lock:
+                resolved = self._known(query)
+            if resolved is None:
+                resolved = self._stored(query)
+            if resolved is None:
+                try:
+                    resolved = self._geocode(query)
+                except requests.exceptions.RequestException:
+                    # Geocoding unavailable: still canonicalized, but not cached, so it is retried later
+                    with self._lock:
+                        self._fallbacks += 1
+                    return direct_location(location)
+                except ValueError:
+                    with self._lock:
+                        self._remember(self._not_found, query, time.monotonic() + self.not_found_ttl)
+                    raise
+            with self._lock:
+                self._remember(self._memory, query, resolved)
+        return resolved
+
+    def stats(self):
+        with self._lock:
+            return {
+                "locations": len(self._memory),
+                "locations_not_found": len(self._not_found),
+                "lookups": self._lookups,
+                "geocode_calls": self._geocodes,
+                "geocode_fallbacks": self._fallbacks
+            }
@@ -0,0 +1,119 @@
+"""
+AgriLens micro-batching scheduler
+Queues single-image requests from every Streamlit session and runs them through
+a model together, flushing a batch when it is full or its oldest request has
+waited `max_wait_ms`.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Every scheduler created in this process, for statistics reporting
+_batchers = []
+
+def batcher_stats():
+    """Returns the statistics of every scheduler in this process."""
+    return [batcher.stats() for batcher in _batchers]
+
+class MicroBatcher:
+    """
+    Collects (224, 224, 3) arrays from many callers into batched calls to
+    `predict_fn`, returning each caller its own row of the output.
+
+    `predict(batch)` mirrors `model.predict`, so a MicroBatcher can be passed
+    anywhere a Keras model is expected.
+    """
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=10, name="model"):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._batched_requests = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._full_batches = 0
+        self._deadline_batches = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"micro-batcher-{name}", daemon=True)
+        self._thread.start()
+        _batchers.append(self)
+
+    def submit(self, img_array):
+        """Queues one preprocessed image and returns a Future for its prediction row."""
+        future = Future()
+        self._queue.put((img_array, future))
+        with self._lock:
+            self._requests += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return future
+
+    def predict(self, batch, timeout=None, **kwargs):
+        """Submits every row of `batch` and waits for all of them, like `model.predict`."""
+        futures = [self.submit(row) for row in batch]
+        return np.stack([future.result(timeout=timeout) for future in futures])
+
+    def _collect(self):
+        """Blocks for the first request, then gathers more until the batch is full or the deadline passes."""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            futures = [future for _, future in items]
+            try:
+                outputs = self.predict_fn(np.stack([img_array for img_array, _ in items]))
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            with self._lock:
+                self._batches += 1
+                if len(items) >= self.max_batch_size:
+                    self._full_batches += 1
+                else:
+                    self._deadline_batches += 1
+                self._batched_requests += len(items)
+
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
+
+    def stats(self):
+        """Returns queue-depth and batch-fill statistics for this scheduler."""
+        with self._lock:
+            mean_batch = self._batched_requests / self._batches if self._batches else 0.0
+            return {
+                "model": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "requests": self._requests,
+                "batches": self._batches,
+                "mean_batch_size": round(mean_batch, 2),
+                "mean_batch_fill": round(mean_batch / self.max_batch_size, 3),
+                "full_batches": self._full_batches,
+                "deadline_batches": self._deadline_batches,
+                "errors": self._errors
+            }
@@ -0,0 +1,129 @@
+"""
+AgriLens model registry
+Loads per-crop disease models on demand and keeps them resident within a RAM
+budget, evicting least-recently-used models before loading a new one that
+would not fit.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+def estimate_model_bytes(model):
+    """
+    Estimates the resident size of a loaded model: the weight tensors of a
+    Keras model, or the flatbuffer size of a TFLite model.
+    """
+    model_path = getattr(model, "model_path", None)
+    if model_path and os.path.exists(model_path):
+        return os.path.getsize(model_path)
+
+    total = 0
+    for weight in getattr(model, "weights", []):
+        dtype = getattr(weight.dtype, "as_numpy_dtype", weight.dtype)
+        total += int(np.prod(weight.shape)) * np.dtype(dtype).itemsize
+    return total
+
+class ModelRegistry:
+    """
+    On-demand cache of (model, class_names) pairs keyed by crop. `loader(crop)`
+    loads a pair; `budget_mb` bounds the estimated total resident size.
+    `size_hint(crop)` estimates a model's size before it is loaded (e.g. its
+    file size), so room is made first; `release()` frees the memory of
+    evicted models (default: gc.collect()).
+    """
+    def __init__(self, loader, budget_mb=2048, size_hint=None, release=gc.collect):
+        self.loader = loader
+        self.size_hint = size_hint
+        self.release = release
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._models = OrderedDict() # key -> (model, class_names, size_bytes), least recent first
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._loads = 0
+        self._evictions = 0
+        self._hits = 0
+        self._load_seconds = 0.0
+
+    @staticmethod
+    def _key(crop):
+        return crop.lower()
+
+    def is_loaded(self, crop):
+        with self._lock:
+            return self._key(crop) in self._models
+
+    def get(self, crop):
+        """Returns the (model, class_names) pair for a crop, loading it if needed."""
+        key = self._key(crop)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._hits += 1
+                model, class_names, _ = self._models[key]
+                return model, class_names
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given crop; others wait and then reuse it
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self._hits += 1
+                    model, class_names, _ = self._models[key]
+                    return model, class_names
+
+            # Make room before loading, so peak residency stays within the budget
+            incoming = self.size_hint(crop) if self.size_hint else 0
+            with self._lock:
+                evicted = self._evict(keep=key, incoming=incoming)
+            if evicted:
+                self.release()
+
+            start = time.perf_counter()
+            model, class_names = self.loader(crop)
+            size = estimate_model_bytes(model)
+
+            with self._lock:
+                self._load_seconds += time.perf_counter() - start
+                self._loads += 1
+                self._models[key] = (model, class_names, size)
+                evicted = self._evict(keep=key) # The estimate can be short of the loaded size
+            if evicted:
+                self.release()
+        return model, class_names
+
+    def _evict(self, keep, incoming=0):
+        """
+        Evicts least-recently-used models until the budget fits `incoming` more
+        bytes. Never evicts `keep`. Returns whether anything was evicted.
+        """
+        evicted = False
+        while self._resident_bytes() + incoming > self.budget_bytes:
+            victim = next((key for key in self._models if key != keep), None)
+            if victim is None:
+                break # A single model larger than the budget stays resident
+            del self._models[victim]
+            self._evictions += 1
+            evicted = True
+        return evicted
+
+    def _resident_bytes(self):
+        return sum(size for _, _, size in self._models.values())
+
+    def stats(self):
+        """Returns per-model resident sizes and load/evict counters."""
+        with self._lock:
+            return {
+                "budget_mb": round(self.budget_bytes / 1024 / 1024, 1),
+                "resident_mb": round(self._resident_bytes() / 1024 / 1024, 2),
+                "models": {key: round(size / 1024 / 1024, 2) for key, (_, _, size) in self._models.items()},
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "hits": self._hits,
+                "load_seconds": round(self._load_seconds, 2)
+            }
@@ -0,0 +1,154 @@
+"""
+AgriLens prediction cache
+Content-addressed cache of decoded model predictions, keyed by a hash of the
+preprocessed pixels and the model file version. A bounded in-memory LRU tier
+sits in front of an optional on-disk tier shared by processes and restarts,
+which is pruned by file age once it grows past its own entry bound.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+def hash_image_array(img_array):
+    """Returns a hex digest of a preprocessed image array's pixels."""
+    # SHA-1 is the fastest hashlib digest here; this is a cache key, not a security boundary
+    return hashlib.sha1(np.ascontiguousarray(img_array).data, usedforsecurity=False).hexdigest()
+
+def model_version(model_path):
+    """Returns a short content hash of a model file, so retrained models never reuse old entries."""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{os.path.basename(model_path)}:{digest.hexdigest()[:16]}"
+
+class PredictionCache:
+    """
+    Two-tier cache of (predicted_class, confidence) results. `max_entries`
+    bounds the in-memory LRU; `disk_dir` enables the on-disk tier. Disk hits
+    refresh a file's mtime, and once more than `max_disk_entries` files exist
+    the least recently used are deleted down to 90% of the bound.
+    """
+    def __init__(self, max_entries=1024, disk_dir=None, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._disk_entries = 0
+        self._disk_evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_entries = len(self._disk_files())
+
+    @staticmethod
+    def make_key(model_version, image_hash):
+        return hashlib.blake2b(f"{model_version}|{image_hash}".encode(), digest_size=16).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_files(self):
+        """Returns (mtime, path) for every entry file in the disk tier."""
+        files = []
+        for shard in os.scandir(self.disk_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    try:
+                        files.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        pass # Pruned by another process
+        return files
+
+    def _prune_disk(self):
+        """Deletes the least recently used entry files down to 90% of max_disk_entries."""
+        files = sorted(self._disk_files())
+        excess = len(files) - int(self.max_disk_entries * 0.9)
+        for _, path in files[:max(excess, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._disk_evictions += max(excess, 0)
+        self._disk_entries = len(files) - max(excess, 0)
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Returns the cached (predicted_class, confidence) for a key, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return self._entries[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path) as f:
+                    value = tuple(json.load(f))
+                os.utime(path) # Keeps entries in use from being pruned
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._remember(key, value)
+                    self._disk_hits += 1
+                return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key, value):
+        """Stores a (predicted_class, confidence) result in both tiers, pruning the disk tier if full."""
+        value = (str(value[0]), float(value[1]))
+        with self._lock:
+            self._remember(key, value)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            is_new = not os.path.exists(path)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(list(value), f)
+            os.replace(tmp_path, path) # Atomic, so concurrent readers never see partial files
+
+            if is_new:
+                with self._disk_lock:
+                    self._disk_entries += 1
+                    if self._disk_entries > self.max_disk_entries:
+                        self._prune_disk()
+
+    def stats(self):
+        """Returns hit/miss counters and the size of both tiers."""
+        with self._lock, self._disk_lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_entries": self._disk_entries,
+                "max_disk_entries": self.max_disk_entries,
+                "disk_evictions": self._disk_evictions,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+            }
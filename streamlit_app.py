@@ -21,12 +21,9 @@ import numpy as np
 import joblib
 import requests
 from datetime import datetime, timedelta
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
 from fpdf import FPDF
 from PIL import Image
 import base64
-import tempfile
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
@@ -35,6 +32,29 @@ import re # Import regex module for string manipulation
 import json
 import random
 import io # Import io module for in-memory file handling
+import tempfile
+import threading
+import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+# TensorFlow is not imported here: inference loads it on first model use
+from inference import (
+    load_disease_model, load_crop_classifier_model, preprocess_image,
+    predict_batch, decode_prediction, check_disease_prediction, warm_vision_stack,
+    backend_model_path, disease_model_paths, load_disease_class_names,
+    disease_model_size, load_crop_classifier_class_names, timed_warm_up, warm_up_crops,
+    CROP_CLASSIFIER_MODEL_PATH
+)
+from inference_pool import InferencePool, CROP_CLASSIFIER_KEY
+from micro_batching import MicroBatcher, batcher_stats
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, hash_image_array, model_version
+from tracing import Tracer, timed_call
+from weather import build_weather_store, fetch_locations, DEFAULT_BASE_URL
+from alert_rules import evaluate_rules
+from charts import WEBGL_THRESHOLD, frame_fingerprint, line_trace
+from translation import BatchTranslator, load_catalogs
+from translation_cache import TranslationDiskCache
 
 try:
     from groq import Groq
@@ -66,6 +86,46 @@ SUPPORTED_LANGUAGES = {
     "Kannada": "kn"
 }
 
+def secret_flag(key, default=False):
+    """
+    Reads an on/off setting from secrets. TOML booleans are used as is, and
+    strings (e.g. from environment-backed secrets) must be "true"/"false"/"1"/"0".
+    """
+    value = st.secrets.get(key, default)
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1"):
+        return True
+    if text in ("false", "0"):
+        return False
+    raise ValueError(f"Secret {key} must be true or false, got {value!r}")
+
+# Precompiled catalogs of the static UI strings (see build_translation_catalog.py)
+TRANSLATION_CATALOG_DIR = st.secrets.get("TRANSLATION_CATALOG_DIR", "translations")
+
+# Translate text missing from the catalogs online; turn off for offline field deployments
+TRANSLATION_ONLINE = secret_flag("TRANSLATION_ONLINE", True)
+
+# SQLite file for online translations shared by all worker processes and restarts ("" keeps them in memory)
+TRANSLATION_CACHE_DB = st.secrets.get("TRANSLATION_CACHE_DB", "")
+TRANSLATION_CACHE_MAX_ENTRIES = int(st.secrets.get("TRANSLATION_CACHE_MAX_ENTRIES", 100000))
+
+@st.cache_resource
+def get_batch_translator():
+    """Returns the process-wide translator: catalog lookups first, then online requests batched per page."""
+    languages = [code for code in SUPPORTED_LANGUAGES.values() if code != "en"]
+    catalogs = load_catalogs(TRANSLATION_CATALOG_DIR, languages)
+    missing = [code for code in languages if code not in catalogs]
+    if missing and not (TRANSLATOR_AVAILABLE and TRANSLATION_ONLINE):
+        print(f"⚠️ No translation catalogs for {', '.join(missing)} in {TRANSLATION_CATALOG_DIR}/ and online "
+              f"translation is off; the UI will stay in English. Run build_translation_catalog.py to create them.")
+    online = None
+    if TRANSLATOR_AVAILABLE and TRANSLATION_ONLINE:
+        online = lambda text, dest, src: translator.translate(text, dest=dest, src=src).text
+    disk_cache = TranslationDiskCache(TRANSLATION_CACHE_DB, TRANSLATION_CACHE_MAX_ENTRIES) if TRANSLATION_CACHE_DB else None
+    return BatchTranslator(online, catalogs=catalogs, disk_cache=disk_cache)
+
 # Language-specific translations for common UI elements
 UI_TRANSLATIONS = {
     "en": {
@@ -75,6 +135,7 @@ UI_TRANSLATIONS = {
         "crop_recommendation": "🌱 Crop Recommendation",
         "weather_dashboard": "🌦️ Weather Dashboard",
         "ai_chatbot": "💬 AI Chatbot",
+        "diagnostics": "🩺 Diagnostics",
         "welcome": "🌿 Welcome to AgriLens",
         "smart_assistant": "Your Smart Crop Assistant",
         "empowering_farmers": "Empowering farmers with AI-driven agricultural insights",
@@ -164,28 +225,36 @@ UI_TRANSLATIONS = {
 }
 
 # Function to translate text
-@st.cache_data(ttl=3600)  # Cache translations for 1 hour
 def translate_text(text, target_language="en"):
     """Translates text to the target language."""
-    if not TRANSLATOR_AVAILABLE or target_language == "en":
-        return text
-    
     try:
-        translation = translator.translate(text, dest=target_language)
-        return translation.text
+        # Served from the catalog, or from the batch translator's cache once the page has been prefetched
+        return get_batch_translator().translate(text, target_language)
     except Exception as e:
         st.error(f"Translation error: {e}")
         return text
 
+def translate_batch(texts, target_language="en"):
+    """Translates many strings in one request per language, returning {text: translation}."""
+    try:
+        return get_batch_translator().translate_many(texts, target_language)
+    except Exception:
+        # translate_text retries these one by one and reports the error
+        return {text: text for text in texts}
+
+def start_page_translations(page, target_language="en"):
+    """Records the page's strings as it renders and prefetches those seen on earlier renders in one batch."""
+    try:
+        get_batch_translator().start_page(page, target_language)
+    except Exception:
+        pass # translate_text retries these one by one and reports the error
+
 # Function to translate text from non-English to English
 def translate_to_english(text, source_language):
     """Translates text from the source language to English."""
-    if not TRANSLATOR_AVAILABLE or source_language == "en":
-        return text
-    
     try:
-        translation = translator.translate(text, src=source_language, dest="en")
-        return translation.text
+        # Shares the translation caches with translate_text, keyed by source language
+        return get_batch_translator().translate(text, "en", src=source_language)
     except Exception as e:
         st.error(f"Translation error: {e}")
         return text
@@ -276,6 +345,76 @@ DISEASE_DETAILS = {
 # Weather API - Use environment variable or Streamlit secrets
 API_KEY = st.secrets.get("OPENWEATHER_API_KEY", "502d8628d859f86e0af77481841f9b6f")
 
+# OpenWeather API root; point it at benchmarks/openweather_standin.py for offline runs and load tests
+OPENWEATHER_BASE_URL = st.secrets.get("OPENWEATHER_BASE_URL", DEFAULT_BASE_URL)
+
+# Seconds a fetched forecast or current reading is reused for a location; older readings up to
+# WEATHER_MAX_STALE are still served while a background refresh replaces them
+WEATHER_CACHE_TTL = int(st.secrets.get("WEATHER_CACHE_TTL", 300))
+WEATHER_MAX_STALE = int(st.secrets.get("WEATHER_MAX_STALE", 86400))
+
+# SQLite file for the weather and geocode caches shared by all worker processes and restarts ("" keeps them in memory)
+WEATHER_CACHE_DB = st.secrets.get("WEATHER_CACHE_DB", "")
+
+# SQLite file recording every fetched reading for long-range trend charts ("" disables the history)
+WEATHER_HISTORY_DB = st.secrets.get("WEATHER_HISTORY_DB", "")
+
+# Geocode locations once and query weather by coordinates, so equivalent spellings share cache entries
+WEATHER_GEOCODE = secret_flag("WEATHER_GEOCODE", True)
+
+# Weather HTTP client: per-attempt connect/read timeouts in seconds and retries with backoff
+WEATHER_CONNECT_TIMEOUT = float(st.secrets.get("WEATHER_CONNECT_TIMEOUT", 3.05))
+WEATHER_READ_TIMEOUT = float(st.secrets.get("WEATHER_READ_TIMEOUT", 10))
+WEATHER_RETRIES = int(st.secrets.get("WEATHER_RETRIES", 2))
+
+# Locations fetched at once by the farm portfolio view
+WEATHER_FETCH_CONCURRENCY = int(st.secrets.get("WEATHER_FETCH_CONCURRENCY", 8))
+
+# Threads for weather lookups started alongside disease analysis
+WEATHER_FETCH_WORKERS = int(st.secrets.get("WEATHER_FETCH_WORKERS", 8))
+
+# Micro-batching settings for the inference scheduler shared by all sessions
+INFERENCE_MAX_BATCH_SIZE = int(st.secrets.get("INFERENCE_MAX_BATCH_SIZE", 16))
+INFERENCE_MAX_WAIT_MS = float(st.secrets.get("INFERENCE_MAX_WAIT_MS", 10))
+
+# Model runtime: "keras", or "tflite-float16" / "tflite-int8" for exports made by export_tflite.py
+INFERENCE_BACKEND = st.secrets.get("INFERENCE_BACKEND", "keras")
+
+# RAM budget for resident crop disease models; least-recently-used models are evicted beyond it.
+# With INFERENCE_WORKERS it is the total across workers, each of which gets an equal share.
+MODEL_MEMORY_BUDGET_MB = float(st.secrets.get("MODEL_MEMORY_BUDGET_MB", 2048))
+
+# Inference worker processes (0 runs models inside the Streamlit process) and their CPU pinning
+INFERENCE_WORKERS = int(st.secrets.get("INFERENCE_WORKERS", 0))
+INFERENCE_PIN_CPUS = secret_flag("INFERENCE_PIN_CPUS", True)
+
+# Prediction cache: in-memory LRU size, plus an optional directory for the shared on-disk tier
+# and the number of entries it keeps before the least recently used are pruned
+PREDICTION_CACHE_SIZE = int(st.secrets.get("PREDICTION_CACHE_SIZE", 1024))
+PREDICTION_CACHE_DIR = st.secrets.get("PREDICTION_CACHE_DIR", "")
+PREDICTION_CACHE_DISK_ENTRIES = int(st.secrets.get("PREDICTION_CACHE_DISK_ENTRIES", 100000))
+
+# Per-stage timing of the Analyze flow: optional JSON-lines log, and the admin diagnostics page
+TRACE_LOG_PATH = st.secrets.get("TRACE_LOG_PATH", "")
+SHOW_DIAGNOSTICS = secret_flag("SHOW_DIAGNOSTICS", False)
+
+# Set by launch_agrilens.py so the serving process loads and warms its models at startup,
+# then writes the readiness file the launcher and deployment health checks wait for
+WARMUP_MODELS = os.environ.get("AGRILENS_WARMUP") == "1"
+READINESS_FILE = os.environ.get("AGRILENS_READY_FILE", "logs/agrilens_ready.json")
+WARMUP_LOG = "logs/model_warmup.jsonl"
+
+# Import TensorFlow in a background thread at startup instead of on first disease analysis
+PRELOAD_VISION_STACK = secret_flag("PRELOAD_VISION_STACK", False)
+
+@st.cache_resource
+def start_vision_stack_warmup():
+    """Starts the background TensorFlow import once per process."""
+    return warm_vision_stack()
+
+if PRELOAD_VISION_STACK:
+    start_vision_stack_warmup()
+
 # Custom CSS for styling
 def local_css(file_name):
     """Loads a local CSS file and applies it to the Streamlit app."""
@@ -289,33 +428,25 @@ def local_css(file_name):
 # Load custom CSS (assuming 'style.css' exists in the same directory)
 local_css("style.css")
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@st.cache_resource
+def get_weather_store():
+    """Returns the process-wide weather store: one fetch per location per WEATHER_CACHE_TTL, shared by all pages."""
+    return build_weather_store(
+        API_KEY,
+        base_url=OPENWEATHER_BASE_URL,
+        ttl=WEATHER_CACHE_TTL,
+        max_stale=WEATHER_MAX_STALE,
+        cache_db=WEATHER_CACHE_DB or None,
+        geocode=WEATHER_GEOCODE,
+        timeout=(WEATHER_CONNECT_TIMEOUT, WEATHER_READ_TIMEOUT),
+        retries=WEATHER_RETRIES,
+        history_db=WEATHER_HISTORY_DB or None
+    )
+
 def get_current_weather(location):
     """Fetches current weather data for a given location."""
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={API_KEY}&units=metric"
     try:
-        response = requests.get(url)
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
-        
-        return {
-            "location": data['name'],
-            "country": data['sys']['country'],
-            "temperature": data['main']['temp'],
-            "feels_like": data['main']['feels_like'],
-            "humidity": data['main']['humidity'],
-            "pressure": data['main']['pressure'],
-            "visibility": data.get('visibility', 0) / 1000,  # Convert to km
-            "wind_speed": data['wind']['speed'],
-            "wind_direction": data['wind'].get('deg', 0),
-            "weather_main": data['weather'][0]['main'],
-            "weather_description": data['weather'][0]['description'],
-            "weather_icon": data['weather'][0]['icon'],
-            "clouds": data['clouds']['all'],
-            "sunrise": datetime.fromtimestamp(data['sys']['sunrise']),
-            "sunset": datetime.fromtimestamp(data['sys']['sunset']),
-            "timestamp": datetime.now()
-        }
+        return get_weather_store().current(location)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching current weather data: {e}. Please check the location or your internet connection.")
         return None
@@ -323,30 +454,10 @@ def get_current_weather(location):
         st.error(f"An unexpected error occurred while fetching current weather data: {e}")
         return None
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_forecast_weather(location):
     """Fetches 5-day weather forecast data for a given location."""
-    url = f"http://api.openweathermap.org/data/2.5/forecast?q={location}&appid={API_KEY}&units=metric"
     try:
-        response = requests.get(url)
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
-        
-        forecast_data = []
-        for item in data['list']:
-            forecast_data.append({
-                'datetime': datetime.fromtimestamp(item['dt']),
-                'temperature': item['main']['temp'],
-                'humidity': item['main']['humidity'],
-                'pressure': item['main']['pressure'],
-                'weather': item['weather'][0]['description'],
-                'weather_icon': item['weather'][0]['icon'],
-                'wind_speed': item['wind']['speed'],
-                'clouds': item['clouds']['all'],
-                'rain': item.get('rain', {}).get('3h', 0) # Get rain volume in last 3 hours
-            })
-        
-        return forecast_data
+        return get_weather_store().forecast(location)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching forecast data: {e}. Please check the location or your internet connection.")
         return None
@@ -354,118 +465,240 @@ def get_forecast_weather(location):
         st.error(f"An unexpected error occurred while fetching forecast data: {e}")
         return None
 
-def get_weather_report(location):
+def fetch_weather_report(location):
     """
     Fetches a simplified weather report for agricultural recommendations.
-    This function is kept for compatibility with existing calls.
+    Returns (report, error_message) and makes no Streamlit calls, so it can
+    run in a worker thread while the models run.
     """
-    url = f"http://api.openweathermap.org/data/2.5/forecast?q={location}&appid={API_KEY}&units=metric"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        rains = []
-        # Check for rain in the next 24 hours (8 * 3-hour forecasts)
-        for i in data["list"][:8]:
-            desc = i["weather"][0]["description"]
-            if "rain" in desc.lower():
-                rains.append(i["dt_txt"])
-
-        forecast = {
-            "location": location,
-            "next_24h_rain": len(rains) > 0,
-            "rain_times": rains,
-            "temperature": f"{data['list'][0]['main']['temp']} °C",
-            "humidity": f"{data['list'][0]['main']['humidity']}%",
-            "weather_icon": data['list'][0]['weather'][0]['icon']
-        }
-
-        forecast["advice"] = (
-            "🌧️ Rain expected — watch for fungal issues and plan irrigation accordingly!"
-            if forecast["next_24h_rain"]
-            else "☀️ Dry weather — monitor irrigation needs and conserve water."
-        )
-        return forecast
+        return get_weather_store().report(location), None
     except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching weather report: {e}. Please check the location or your internet connection.")
-        return None
+        return None, f"Error fetching weather report: {e}. Please check the location or your internet connection."
     except Exception as e:
-        st.error(f"An unexpected error occurred while fetching weather report: {e}")
-        return None
+        return None, f"An unexpected error occurred while fetching weather report: {e}"
+
+def get_weather_report(location):
+    """
+    Fetches a simplified weather report for agricultural recommendations.
+    This function is kept for compatibility with existing calls.
+    """
+    forecast, error = fetch_weather_report(location)
+    if error:
+        st.error(error)
+    return forecast
 
-def create_temperature_chart(forecast_data):
+@st.cache_resource
+def get_weather_executor():
+    """Returns the process-wide thread pool for weather lookups that overlap model inference."""
+    return ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS, thread_name_prefix="weather")
+
+def create_temperature_chart(forecast_data, language_code="en"):
     """Generates a Plotly chart for temperature trends over 5 days."""
-    df = pd.DataFrame(forecast_data)
-    df['date'] = df['datetime'].dt.strftime('%m/%d %H:%M')
-    
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df['date'],
-        y=df['temperature'],
+    fig.add_trace(line_trace(
+        forecast_data['label'],
+        forecast_data['temperature'],
         mode='lines+markers',
-        name='Temperature',
+        name=translate_text('Temperature', language_code),
         line=dict(color='#ff6b6b', width=3),
         marker=dict(size=6)
     ))
     
     fig.update_layout(
-        title="Temperature Forecast (5 Days)",
-        xaxis_title="Date & Time",
-        yaxis_title="Temperature (°C)",
+        title=translate_text("Temperature Forecast (5 Days)", language_code),
+        xaxis_title=translate_text("Date & Time", language_code),
+        yaxis_title=f"{translate_text('Temperature', language_code)} (°C)",
         template="plotly_white",
         height=400
     )
     
     return fig
 
-def create_humidity_pressure_chart(forecast_data):
+def create_humidity_pressure_chart(forecast_data, language_code="en"):
     """Generates a Plotly chart for humidity and pressure trends."""
-    df = pd.DataFrame(forecast_data)
-    df['date'] = df['datetime'].dt.strftime('%m/%d %H:%M')
-    
     fig = make_subplots(
         rows=2, cols=1,
-        subplot_titles=('Humidity (%)', 'Pressure (hPa)'),
+        subplot_titles=(f"{translate_text('Humidity', language_code)} (%)", f"{translate_text('Pressure', language_code)} (hPa)"),
         vertical_spacing=0.4
     )
     fig.update_layout(showlegend=False)
 
     # Humidity
     fig.add_trace(
-        go.Scatter(x=df['date'], y=df['humidity'], 
-                  mode='lines+markers', name='Humidity',
+        line_trace(forecast_data['label'], forecast_data['humidity'], 
+                  mode='lines+markers', name=translate_text('Humidity', language_code),
                   line=dict(color='#4ecdc4', width=2)),
         row=1, col=1
     )
     
     # Pressure
     fig.add_trace(
-        go.Scatter(x=df['date'], y=df['pressure'], 
-                  mode='lines+markers', name='Pressure',
+        line_trace(forecast_data['label'], forecast_data['pressure'], 
+                  mode='lines+markers', name=translate_text('Pressure', language_code),
                   line=dict(color='#45b7d1', width=2)),
         row=2, col=1
     )
     
     fig.update_layout(height=500, template="plotly_white")
-    fig.update_xaxes(title_text="Date & Time", row=2, col=1)
+    fig.update_xaxes(title_text=translate_text("Date & Time", language_code), row=2, col=1)
     
     return fig
 
-def create_weather_summary_chart(forecast_data):
+def create_weather_summary_chart(forecast_data, language_code="en"):
     """Generates a Plotly pie chart summarizing weather conditions."""
-    df = pd.DataFrame(forecast_data)
-    weather_counts = df['weather'].value_counts()
+    weather_counts = forecast_data['weather'].value_counts()
     
     fig = px.pie(
         values=weather_counts.values,
-        names=weather_counts.index,
-        title="Weather Conditions Distribution (Next 5 Days)"
+        names=[translate_text(w.title(), language_code) for w in weather_counts.index],
+        title=translate_text("Weather Conditions Distribution (Next 5 Days)", language_code)
     )
     
     fig.update_layout(height=400)
     return fig
 
+def create_history_chart(history, language_code="en"):
+    """Generates a Plotly chart of temperature range and rainfall from downsampled history."""
+    rain_name = f"{translate_text('Rainfall', language_code)} (mm)"
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    if len(history) > WEBGL_THRESHOLD:
+        # Thousands of bars render slowly; draw long rainfall series as a filled WebGL line
+        rain = line_trace(history['bucket'], history['rain_total'], name=rain_name, mode='lines',
+                          line=dict(color='#45b7d1', width=1), fill='tozeroy')
+    else:
+        rain = go.Bar(x=history['bucket'], y=history['rain_total'], name=rain_name, marker_color='#45b7d1', opacity=0.5)
+    fig.add_trace(rain, secondary_y=True)
+    fig.add_trace(line_trace(
+        history['bucket'], history['temp_max'], name=translate_text('Max Temperature', language_code),
+        mode='lines', line=dict(color='#ff6b6b', width=2)
+    ))
+    fig.add_trace(line_trace(
+        history['bucket'], history['temp_min'], name=translate_text('Min Temperature', language_code),
+        mode='lines', line=dict(color='#4ecdc4', width=2), fill='tonexty'
+    ))
+
+    fig.update_layout(title=translate_text("Temperature Range & Rainfall", language_code), template="plotly_white", height=450)
+    fig.update_xaxes(title_text=translate_text("Date", language_code))
+    fig.update_yaxes(title_text=f"{translate_text('Temperature', language_code)} (°C)", secondary_y=False)
+    fig.update_yaxes(title_text=rain_name, secondary_y=True)
+    return fig
+
+CHART_BUILDERS = {
+    "temperature": create_temperature_chart,
+    "humidity_pressure": create_humidity_pressure_chart,
+    "weather_summary": create_weather_summary_chart,
+    "history": create_history_chart
+}
+
+@st.cache_data(max_entries=256)
+def build_chart(chart, fingerprint, language_code, _data):
+    """
+    Builds a figure once per data fingerprint and language; `_data` is not
+    hashed by Streamlit. cache_data hands each caller its own copy, so a
+    session that changes its figure never affects another's.
+    """
+    return CHART_BUILDERS[chart](_data, language_code)
+
+def cached_chart(chart, data, language_code):
+    """Returns the memoized figure for `data`, so reruns with unchanged data skip rebuilding it."""
+    return build_chart(chart, frame_fingerprint(data), language_code, data)
+
+def display_weather_history(location):
+    """Shows long-range trends for a location from the recorded weather history."""
+    language_code = st.session_state.language_code
+    st.subheader(f"📈 {translate_text('Weather History', language_code)}")
+    col1, col2 = st.columns(2)
+    with col1:
+        days = st.selectbox(translate_text("Period (days)", language_code), [30, 90, 180, 365], index=1)
+    with col2:
+        resolution = st.selectbox(
+            translate_text("Resolution", language_code), ["day", "week", "hour"],
+            format_func=lambda r: translate_text({"day": "Daily", "week": "Weekly", "hour": "Hourly"}[r], language_code)
+        )
+
+    # One downsampling query over the indexed history; nothing is refetched
+    end = datetime.now() + timedelta(days=6) # Include the forecast days already recorded
+    history = get_weather_store().history_for(location, end - timedelta(days=days + 6), end, resolution)
+    if history is None or history.empty:
+        st.info(translate_text("No weather history recorded for this location yet.", language_code))
+        return
+    st.plotly_chart(cached_chart("history", history, language_code), use_container_width=True)
+    st.caption(
+        f"{translate_text('Total rainfall', language_code)}: {history['rain_total'].sum():.1f} mm | "
+        f"{translate_text('Highest', language_code)}: {history['temp_max'].max():.1f}°C | "
+        f"{translate_text('Lowest', language_code)}: {history['temp_min'].min():.1f}°C"
+    )
+
+def format_weather_alert(alert, language_code):
+    """
+    Returns the translated dashboard text for one evaluate_rules alert.
+    Raises ValueError for a rule the dashboard has no text for.
+    """
+    kind, value = alert.rule, alert.value
+    if kind == "heat":
+        return f"🔥 **{translate_text('Heat Warning', language_code)}**: {translate_text('Maximum temperature expected', language_code)}: {value:.1f}°C. {translate_text('Take precautions to protect crops from extreme heat.', language_code)}"
+    if kind == "frost":
+        return f"🧊 **{translate_text('Frost Warning', language_code)}**: {translate_text('Minimum temperature expected', language_code)}: {value:.1f}°C. {translate_text('Implement frost protection measures immediately.', language_code)}"
+    if kind == "wind":
+        return f"💨 **{translate_text('Wind Warning', language_code)}**: {translate_text('Maximum wind speed expected', language_code)}: {value:.1f} m/s. {translate_text('Secure vulnerable structures and plants.', language_code)}"
+    if kind == "fungal_risk":
+        return f"🍄 **{translate_text('Fungal Disease Risk', language_code)}**: {translate_text('Hours of very high humidity expected', language_code)}: {value:.0f} h ({alert.start:%m/%d %H:%M}). {translate_text('Inspect leaves closely and consider a preventive fungicide application.', language_code)}"
+    if kind == "heavy_rain":
+        return f"🌧️ **{translate_text('Heavy Rain Warning', language_code)}**: {translate_text('Total rainfall expected', language_code)}: {value:.1f} mm. {translate_text('Ensure proper drainage to prevent waterlogging and root rot.', language_code)}"
+    raise ValueError(f"No dashboard text for weather alert rule '{kind}'")
+
+def display_farm_portfolio():
+    """Fetches all farms' weather in one concurrent round and shows their conditions and alerts."""
+    language_code = st.session_state.language_code
+    st.subheader(f"🗺️ {translate_text('Farm Portfolio', language_code)}")
+    farms_text = st.text_area(
+        translate_text("Farm locations (one per line)", language_code),
+        value="\n".join(st.session_state.get("portfolio_locations", [])),
+        height=120
+    )
+    if not st.button(f"🔄 {translate_text('Check All Farms', language_code)}"):
+        return
+
+    # Keep order, drop blanks and duplicates
+    locations = list(dict.fromkeys(line.strip() for line in farms_text.splitlines() if line.strip()))
+    st.session_state.portfolio_locations = locations
+    if not locations:
+        st.warning(translate_text("Enter at least one farm location.", language_code))
+        return
+
+    with st.spinner(translate_text("Fetching weather for all farms...", language_code)):
+        results = fetch_locations(get_weather_store(), locations, WEATHER_FETCH_CONCURRENCY)
+
+    # Evaluate the alert rules for every farm in one pass
+    alerts = evaluate_rules({result["location"]: result["forecast"] for result in results if not result["error"]})
+    alert_counts = pd.Series([alert.location for alert in alerts], dtype=object).value_counts()
+    alert_lines = [f"**{alert.location}** — {format_weather_alert(alert, language_code)}" for alert in alerts]
+
+    translate_batch(
+        [result["current"]["weather_description"].title() for result in results if not result["error"]], language_code
+    )
+    rows = []
+    for result in results:
+        if result["error"]:
+            rows.append({"Farm": result["location"], "Alerts": 0, "Error": result["error"]})
+            continue
+        rows.append({
+            "Farm": result["location"],
+            "Temp (°C)": round(result["current"]["temperature"], 1),
+            "Humidity (%)": result["current"]["humidity"],
+            "Wind (m/s)": round(result["current"]["wind_speed"], 1),
+            "Weather": translate_text(result["current"]["weather_description"].title(), language_code),
+            "Alerts": int(alert_counts.get(result["location"], 0))
+        })
+
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    st.markdown(
+        "<div style='color:#111; font-size:1.1rem;'>" + "<br>".join(alert_lines) + "</div>" if alert_lines
+        else f"✅ {translate_text('No significant weather alerts for any farm.', language_code)}",
+        unsafe_allow_html=True
+    )
+
 def display_weather_dashboard():
     """Displays the interactive weather dashboard page."""
     st.header(f"🌦️ {translate_text('Live Weather Dashboard', st.session_state.language_code)}")
@@ -488,7 +721,13 @@ def display_weather_dashboard():
         current_weather = get_current_weather(location)
         forecast_data = get_forecast_weather(location)
         
-        if current_weather and forecast_data:
+        if current_weather and forecast_data is not None:
+            # Weather conditions vary between fetches; translate them together with the page's strings
+            translate_batch([
+                current_weather['weather_main'], current_weather['weather_description'].title(),
+                *(w.title() for w in forecast_data['weather'].unique())
+            ], st.session_state.language_code)
+
             # Current Weather Section
             st.subheader(translate_text("Current Weather Conditions", st.session_state.language_code))
             
@@ -581,16 +820,16 @@ def display_weather_dashboard():
             st.subheader(translate_text("Weather Forecast Charts", st.session_state.language_code))
             
             # Temperature chart
-            temp_chart = create_temperature_chart(forecast_data)
+            temp_chart = cached_chart("temperature", forecast_data, st.session_state.language_code)
             st.plotly_chart(temp_chart, use_container_width=True)
             
             # Humidity and Pressure charts side-by-side
             
             
-            humidity_pressure_chart = create_humidity_pressure_chart(forecast_data)
+            humidity_pressure_chart = cached_chart("humidity_pressure", forecast_data, st.session_state.language_code)
             st.plotly_chart(humidity_pressure_chart, use_container_width=True)
             
-            weather_summary_chart = create_weather_summary_chart(forecast_data)
+            weather_summary_chart = cached_chart("weather_summary", forecast_data, st.session_state.language_code)
             st.plotly_chart(weather_summary_chart, use_container_width=True)
             
             st.markdown("---")
@@ -614,8 +853,7 @@ def display_weather_dashboard():
                 recommendations.append(f"💨 **{translate_text('Strong Winds', st.session_state.language_code)}**: {translate_text('Secure tall plants and greenhouses to prevent structural damage. Check for wind burn on leaves regularly.', st.session_state.language_code)}")
             
             # Check for rain in forecast
-            rain_forecast = [item for item in forecast_data if item['rain'] > 0]
-            if rain_forecast:
+            if (forecast_data['rain'] > 0).any():
                 recommendations.append(f"🌧️ **{translate_text('Rain Expected', st.session_state.language_code)}**: {translate_text('Prepare drainage systems to prevent waterlogging and consider delaying pesticide applications that could be washed away.', st.session_state.language_code)}")
             else:
                 recommendations.append(f"☀️ **{translate_text('Dry Conditions', st.session_state.language_code)}**: {translate_text('Plan irrigation schedule carefully and monitor soil moisture levels closely to avoid drought stress.', st.session_state.language_code)}")
@@ -633,8 +871,8 @@ def display_weather_dashboard():
             # Hourly forecast table
             st.subheader(f"📊 {translate_text('Detailed Hourly Forecast', st.session_state.language_code)}")
             
-            # Create forecast DataFrame for display (next 24 hours)
-            df_display = pd.DataFrame(forecast_data[:24]) 
+            # Select the display columns from the shared forecast (next 24 entries)
+            next_steps = forecast_data.iloc[:24]
             time_col = translate_text('Time', st.session_state.language_code)
             temp_col = f"{translate_text('Temp', st.session_state.language_code)} (°C)"
             humidity_col = f"{translate_text('Humidity', st.session_state.language_code)} (%)"
@@ -642,12 +880,16 @@ def display_weather_dashboard():
             weather_col = translate_text('Weather', st.session_state.language_code)
             rain_col = f"{translate_text('Rain', st.session_state.language_code)} (mm)"
             
-            df_display[time_col] = df_display['datetime'].dt.strftime('%m/%d %H:%M')
-            df_display[temp_col] = df_display['temperature'].round(1)
-            df_display[humidity_col] = df_display['humidity']
-            df_display[wind_col] = df_display['wind_speed'].round(1)
-            df_display[weather_col] = df_display['weather'].apply(lambda x: translate_text(x.title(), st.session_state.language_code))
-            df_display[rain_col] = df_display['rain'].round(1)
+            # Translate each distinct condition once rather than once per row
+            weather_names = {w: translate_text(w.title(), st.session_state.language_code) for w in next_steps['weather'].unique()}
+            df_display = pd.DataFrame({
+                time_col: next_steps['label'],
+                temp_col: next_steps['temperature'].round(1),
+                humidity_col: next_steps['humidity'].round().astype(int),
+                wind_col: next_steps['wind_speed'].round(1),
+                weather_col: next_steps['weather'].map(weather_names),
+                rain_col: next_steps['rain'].round(1)
+            })
             
             st.dataframe(
                 df_display[[time_col, temp_col, humidity_col, wind_col, weather_col, rain_col]],
@@ -656,22 +898,11 @@ def display_weather_dashboard():
             
             # Weather alerts section
             st.subheader(f"⚠️ {translate_text('Weather Alerts', st.session_state.language_code)}")
-            alerts = []
-            
-            # Check for extreme conditions in forecast for the next 24 hours
-            max_temp = max([item['temperature'] for item in forecast_data[:24]])
-            min_temp = min([item['temperature'] for item in forecast_data[:24]])
-            max_wind = max([item['wind_speed'] for item in forecast_data[:24]])
-            total_rain = sum([item['rain'] for item in forecast_data[:24]])
-            
-            if max_temp > 35:
-                alerts.append(f"🔥 **{translate_text('Heat Warning', st.session_state.language_code)}**: {translate_text('Maximum temperature expected', st.session_state.language_code)}: {max_temp:.1f}°C. {translate_text('Take precautions to protect crops from extreme heat.', st.session_state.language_code)}")
-            if min_temp < 0:
-                alerts.append(f"🧊 **{translate_text('Frost Warning', st.session_state.language_code)}**: {translate_text('Minimum temperature expected', st.session_state.language_code)}: {min_temp:.1f}°C. {translate_text('Implement frost protection measures immediately.', st.session_state.language_code)}")
-            if max_wind > 15:
-                alerts.append(f"💨 **{translate_text('Wind Warning', st.session_state.language_code)}**: {translate_text('Maximum wind speed expected', st.session_state.language_code)}: {max_wind:.1f} m/s. {translate_text('Secure vulnerable structures and plants.', st.session_state.language_code)}")
-            if total_rain > 20:
-                alerts.append(f"🌧️ **{translate_text('Heavy Rain Warning', st.session_state.language_code)}**: {translate_text('Total rainfall expected', st.session_state.language_code)}: {total_rain:.1f} mm. {translate_text('Ensure proper drainage to prevent waterlogging and root rot.', st.session_state.language_code)}")
+            # Check for extreme conditions in the forecast
+            alerts = [
+                format_weather_alert(alert, st.session_state.language_code)
+                for alert in evaluate_rules({location: forecast_data})
+            ]
             if alerts:
                 st.markdown(
         "<div style='color:#111; font-size:1.1rem;'>" + "<br>".join(alerts) + "</div>",
@@ -683,25 +914,39 @@ def display_weather_dashboard():
         unsafe_allow_html=True
     )       
 
+            if get_weather_store().history:
+                st.markdown("---")
+                display_weather_history(location)
+
+    st.markdown("---")
+    display_farm_portfolio()
+
 @st.cache_resource
-def load_model_and_classes(crop):
+def get_model_registry():
     """
-    Loads the Keras model and class names for a specific crop disease model.
-    Cached to avoid reloading on every prediction.
+    Returns the process-wide registry of crop disease models. Models load on
+    demand and the least-recently-used one is evicted beyond MODEL_MEMORY_BUDGET_MB.
+    Evictions only gc.collect(): batcher threads may be predicting while one
+    happens, so Keras' global session must not be cleared under them.
     """
-    model_path = f"models/{crop.lower()}_model.h5"
-    class_path = f"data/{crop.lower()}_class_names.npy"
+    return ModelRegistry(
+        lambda crop: load_disease_model(crop, INFERENCE_BACKEND),
+        budget_mb=MODEL_MEMORY_BUDGET_MB,
+        size_hint=lambda crop: disease_model_size(crop, INFERENCE_BACKEND)
+    )
 
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Disease model not found for {crop}: {model_path}")
-    if not os.path.exists(class_path):
-        raise FileNotFoundError(f"Disease class names not found for {crop}: {class_path}")
+def load_model_and_classes(crop):
+    """
+    Loads the model and class names for a specific crop disease model using
+    the configured INFERENCE_BACKEND, through the memory-budgeted model registry.
+    """
+    registry = get_model_registry()
+    if registry.is_loaded(crop):
+        return registry.get(crop)
 
     # Show loading message for first load only
     with st.spinner(f"Loading {crop} disease detection model..."):
-        model = load_model(model_path)
-        class_names = np.load(class_path, allow_pickle=True)
-    return model, class_names
+        return registry.get(crop)
 
 @st.cache_resource
 def load_crop_classifier():
@@ -709,66 +954,258 @@ def load_crop_classifier():
     Loads the general crop classifier model and its class names.
     Returns None if the model is not found. Cached for performance.
     """
-    model_path = "models/crop_classifier_apple_corn_unknown.h5"
-    class_path = "data/crop_classifier_classes.npy"
-
-    if not os.path.exists(model_path) or not os.path.exists(class_path):
-        return None, None # Return None if model files don't exist
-    
     with st.spinner("Loading crop classifier model..."):
-        model = load_model(model_path)
-        class_names = np.load(class_path, allow_pickle=True)
+        model, class_names = load_crop_classifier_model(INFERENCE_BACKEND)
     return model, class_names
 
-def predict_disease(image_path, model, class_names, selected_crop):
+@st.cache_resource
+def load_crop_recommendation_model():
+    """Load and cache crop recommendation model"""
+    if not os.path.exists("models/crop_recommendation_model.pkl"):
+        return None
+    return joblib.load("models/crop_recommendation_model.pkl")
+
+@st.cache_resource
+def get_model_batcher(model_key, _get_model):
     """
-    Performs prediction on an uploaded image using a specific disease model.
+    Returns the micro-batching scheduler for a model. Cached so requests from
+    every session share one queue per model. `_get_model` is called for each
+    batch, so a model evicted from the registry is reloaded rather than pinned.
     """
-    img = image.load_img(image_path, target_size=(224, 224))
-    img_array = image.img_to_array(img) / 255.0 # Normalize pixel values
-    img_array = np.expand_dims(img_array, axis=0) # Add batch dimension
-
-    predictions = model.predict(img_array)
-    predicted_index = np.argmax(predictions[0])
-    predicted_class = class_names[predicted_index]
-    confidence = round(np.max(predictions[0]) * 100, 2)
-
-    # Define a robust mapping for selected crop to its expected class name prefix
-    crop_name_mapping = {
-        "apple": "Apple",
-        "corn": "Corn_(maize)",
-        "grape": "Grape",
-        "potato": "Potato",
-        "tomato": "Tomato"
-    }
-    
-    expected_prefix = crop_name_mapping.get(selected_crop.lower())
+    return MicroBatcher(
+        lambda batch: predict_batch(_get_model(), batch, INFERENCE_MAX_BATCH_SIZE),
+        max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=INFERENCE_MAX_WAIT_MS,
+        name=model_key
+    )
 
-    if not expected_prefix or not predicted_class.startswith(expected_prefix):
-        return "Incompatible Image", 0.0
+@st.cache_resource
+def get_inference_pool():
+    """Starts the inference worker processes once per Streamlit process and waits until they are ready."""
+    pool = InferencePool(INFERENCE_WORKERS, INFERENCE_BACKEND, INFERENCE_PIN_CPUS, MODEL_MEMORY_BUDGET_MB)
+    pool.start()
+    atexit.register(pool.shutdown) # Stop the worker processes with the server
+    return pool
 
-    INTERNAL_CONFIDENCE_THRESHOLD = 60.0
+@st.cache_resource
+def load_crop_classifier_classes():
+    """Loads the crop classifier's class names without its model (used with worker processes)."""
+    return load_crop_classifier_class_names(INFERENCE_BACKEND)
 
-    if confidence < INTERNAL_CONFIDENCE_THRESHOLD:
-        return "Incompatible Image", 0.0
-    
-    return predicted_class, confidence
+@st.cache_resource
+def load_class_names(crop):
+    """Loads a crop's disease class names without loading its model (used with worker processes)."""
+    return load_disease_class_names(crop)
+
+def get_crop_model_runner(crop_classifier_model):
+    """Returns what predict_crop should run: the worker pool, or the shared in-process batcher."""
+    if INFERENCE_WORKERS:
+        return get_inference_pool().model(CROP_CLASSIFIER_KEY)
+    return get_model_batcher("crop_classifier", lambda: crop_classifier_model)
 
-def predict_crop(image_path, model, class_names):
+def get_disease_model_runner(crop):
     """
-    Performs prediction on an uploaded image using the general crop classifier model.
+    Returns (runner, class_names) for predict_disease: the worker pool, or the
+    shared in-process batcher over the model registry.
+    """
+    if INFERENCE_WORKERS:
+        return get_inference_pool().model(crop), load_class_names(crop)
+
+    _, class_names = load_model_and_classes(crop)
+    registry = get_model_registry()
+    return get_model_batcher(crop.lower(), lambda: registry.get(crop)[0]), class_names
+
+def warm_up_cached_models():
+    """
+    Loads every model through the cached loaders and runs a dummy input
+    through each, so the first request skips loading and graph tracing. With
+    worker processes, each worker loads and warms its own disease models.
+    Returns {model: {"load_s": ..., "first_inference_s": ...}}.
+    """
+    start = time.perf_counter()
+    recommender = load_crop_recommendation_model()
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    if recommender is not None:
+        recommender.predict([[0, 0, 0, 0, 0, 0, 0]]) # N, P, K, temperature, humidity, ph, rainfall
+    results = {"crop_recommendation": {"load_s": round(load_s, 3), "first_inference_s": round(time.perf_counter() - start, 3)}}
+
+    if INFERENCE_WORKERS:
+        for index, worker in sorted(get_inference_pool().warmup.items()):
+            for name, timings in worker["models"].items():
+                results[f"worker-{index}/{name}"] = timings
+        return results
+
+    crop_classifier_model, results[CROP_CLASSIFIER_KEY] = timed_warm_up(lambda: load_crop_classifier()[0])
+    for crop in warm_up_crops(load_crop_classifier()[1] if crop_classifier_model is not None else None):
+        try:
+            _, results[crop.lower()] = timed_warm_up(lambda: load_model_and_classes(crop)[0])
+        except FileNotFoundError:
+            continue
+    return results
+
+def warm_up_and_report_ready():
+    """
+    Warms the models in this serving process, appends the timings to WARMUP_LOG
+    so cold-start regressions can be tracked, then writes READINESS_FILE.
+    """
+    try:
+        results = warm_up_cached_models()
+    except Exception as e:
+        print(f"❌ Model warm-up failed; not reporting ready: {e}")
+        return
+
+    os.makedirs(os.path.dirname(WARMUP_LOG), exist_ok=True)
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    with open(WARMUP_LOG, "a") as f:
+        for name, timings in results.items():
+            f.write(json.dumps({"timestamp": timestamp, "backend": INFERENCE_BACKEND, "model": name, **timings}) + "\n")
+
+    # Written to a temporary file and renamed, so readers never see a partial file
+    os.makedirs(os.path.dirname(READINESS_FILE) or ".", exist_ok=True)
+    with open(READINESS_FILE + ".tmp", "w") as f:
+        json.dump({"ready": True, "since": timestamp, "pid": os.getpid(), "backend": INFERENCE_BACKEND, "models": results}, f, indent=2)
+    os.replace(READINESS_FILE + ".tmp", READINESS_FILE)
+
+@st.cache_resource
+def start_model_warmup():
+    """Starts the background model warm-up once per process."""
+    thread = threading.Thread(target=warm_up_and_report_ready, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+# Runs on the first script run in this process, which the launcher triggers at server start
+if WARMUP_MODELS:
+    start_model_warmup()
+
+@st.cache_resource
+def get_prediction_cache():
+    """Returns the process-wide prediction cache shared by all sessions."""
+    return PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DIR or None, PREDICTION_CACHE_DISK_ENTRIES)
+
+@st.cache_resource
+def get_model_version(model_path):
+    """Returns the content hash of a model file, computed once per process."""
+    return model_version(model_path)
+
+def run_model(img_array, model, class_names, version=None):
+    """
+    Returns the decoded (predicted_class, confidence) for one image array.
+    When a model version is given, results are served from the prediction cache.
+    """
+    if version is None:
+        predictions = model.predict(np.expand_dims(img_array, axis=0)) # Add batch dimension
+        return decode_prediction(predictions[0], class_names)
+
+    cache = get_prediction_cache()
+    key = PredictionCache.make_key(version, hash_image_array(img_array))
+    result = cache.get(key)
+    if result is None:
+        result = run_model(img_array, model, class_names)
+        cache.put(key, result)
+    return result
+
+def predict_disease(img_array, model, class_names, selected_crop, version=None):
+    """
+    Performs prediction on a preprocessed (224, 224, 3) image array using a specific disease model.
+    """
+    predicted_class, confidence = run_model(img_array, model, class_names, version)
+
+    return check_disease_prediction(predicted_class, confidence, selected_crop)
+
+def predict_crop(img_array, model, class_names, version=None):
+    """
+    Performs prediction on a preprocessed (224, 224, 3) image array using the general crop classifier model.
     """
-    img = image.load_img(image_path, target_size=(224, 224))
-    img_array = image.img_to_array(img) / 255.0
-    img_array = np.expand_dims(img_array, axis=0)
-
-    predictions = model.predict(img_array)
-    predicted_index = np.argmax(predictions[0])
-    predicted_class = class_names[predicted_index]
-    confidence = round(np.max(predictions[0]) * 100, 2)
-    
     # Assuming the classes are 'Apple', 'Corn', 'Unknown'
-    return predicted_class, confidence
+    return run_model(img_array, model, class_names, version)
+
+@st.cache_resource
+def get_tracer():
+    """Returns the process-wide tracer that aggregates Analyze stage timings from all sessions."""
+    return Tracer(log_path=TRACE_LOG_PATH or None)
+
+def decode_uploaded_image(image_bytes):
+    """Decodes uploaded image bytes, returning the image and the decode time in seconds."""
+    start = time.perf_counter()
+    img = Image.open(io.BytesIO(image_bytes))
+    img.load() # PIL decodes lazily; force it so the cost is measured here
+    return img, time.perf_counter() - start
+
+def display_inference_stats():
+    """Shows the scheduler, prediction cache and model registry counters."""
+    st.markdown("**Scheduler**")
+    st.dataframe(pd.DataFrame(batcher_stats()), use_container_width=True)
+    st.markdown("**Prediction Cache**")
+    st.dataframe(pd.DataFrame([get_prediction_cache().stats()]), use_container_width=True)
+    st.markdown("**Model Registry**")
+    registry_stats = get_model_registry().stats()
+    st.dataframe(pd.DataFrame([{k: v for k, v in registry_stats.items() if k != "models"}]), use_container_width=True)
+    if registry_stats["models"]:
+        st.dataframe(
+            pd.DataFrame(list(registry_stats["models"].items()), columns=["Model", "Resident MB"]),
+            use_container_width=True
+        )
+
+def display_diagnostics():
+    """Admin page with per-stage latency histograms of the Analyze flow and trace export."""
+    st.header("🩺 Diagnostics")
+    tracer = get_tracer()
+    summary = tracer.summary()
+    if summary:
+        display_trace_summary(tracer, summary)
+    else:
+        st.info("No requests traced yet. Run an analysis on the Disease Detection page.")
+
+    if batcher_stats():
+        st.subheader("Inference")
+        display_inference_stats()
+
+    st.subheader("Weather")
+    store = get_weather_store()
+    client_stats = store.client.stats()
+    st.dataframe(pd.DataFrame([store.stats() | {"circuit": client_stats["circuit"]["state"]}]), use_container_width=True)
+    if client_stats["endpoints"]:
+        st.dataframe(pd.DataFrame(client_stats["endpoints"]), use_container_width=True)
+
+    st.subheader("Translation")
+    st.dataframe(pd.DataFrame([get_batch_translator().stats()]), use_container_width=True)
+
+def display_trace_summary(tracer, summary):
+    """Shows per-stage latency statistics, a histogram and recent requests, with export buttons."""
+    st.subheader("Stage Latency")
+    st.dataframe(pd.DataFrame(summary), use_container_width=True)
+
+    stages = [(row["request"], row["stage"]) for row in summary]
+    request_name, stage = st.selectbox("Stage histogram", stages, format_func=lambda s: f"{s[0]} / {s[1]}")
+    buckets = pd.DataFrame(tracer.bucket_counts(request_name, stage), columns=["Duration", "Requests"])
+    fig = px.bar(buckets, x="Duration", y="Requests", title=f"{stage} latency distribution")
+    st.plotly_chart(fig, use_container_width=True)
+
+    records = tracer.export_records()
+    st.subheader("Recent Requests")
+    recent = pd.DataFrame(records).pivot_table(
+        index=["started_at", "request_id"], columns="stage", values="duration_ms", sort=False
+    ).iloc[::-1].head(50)
+    st.dataframe(recent, use_container_width=True)
+
+    download_col1, download_col2 = st.columns(2)
+    with download_col1:
+        st.download_button(
+            "⬇️ Export Traces (CSV)",
+            pd.DataFrame(records).to_csv(index=False),
+            file_name="agrilens_traces.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+    with download_col2:
+        st.download_button(
+            "⬇️ Export Traces (JSON)",
+            json.dumps({"summary": summary, "records": records}, indent=2),
+            file_name="agrilens_traces.json",
+            mime="application/json",
+            use_container_width=True
+        )
 
 class PDF(FPDF):
     """Custom PDF class for generating reports."""
@@ -790,8 +1227,11 @@ def safe_text(text):
     """Encodes text to latin-1 to prevent PDF generation errors with special characters."""
     return text.encode("latin-1", "replace").decode("latin-1")
 
-def generate_pdf(report_data, image_path, out_path="report.pdf"):
-    """Generates a PDF report with analysis results and weather information."""
+def generate_pdf(report_data, image=None, out_path="report.pdf"):
+    """
+    Generates a PDF report with analysis results and weather information.
+    `image` is the uploaded leaf as a PIL image (or an image file path).
+    """
     pdf = PDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
@@ -821,8 +1261,17 @@ def generate_pdf(report_data, image_path, out_path="report.pdf"):
     pdf.ln(10)
 
     # Add uploaded image to PDF
-    if os.path.exists(image_path):
-        pdf.image(image_path, w=80, h=60)
+    if isinstance(image, Image.Image):
+        # PyFPDF only embeds image files, so write the decoded upload out just for the report
+        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as image_file:
+            image.convert("RGB").save(image_file, format="JPEG", quality=90)
+        try:
+            pdf.image(image_file.name, w=80, h=60)
+        finally:
+            os.remove(image_file.name)
+        pdf.ln(10)
+    elif image and os.path.exists(image):
+        pdf.image(image, w=80, h=60)
         pdf.ln(10)
 
     # Weather section in PDF
@@ -850,6 +1299,14 @@ def generate_pdf(report_data, image_path, out_path="report.pdf"):
         pdf.set_font("Arial", size=12)
         pdf.multi_cell(0, 10, txt=safe_text(weather["advice"]))
 
+        if weather.get("alerts"):
+            pdf.ln(5)
+            pdf.set_font("Arial", "B", 12)
+            pdf.cell(200, 10, txt="Weather Alerts:", ln=True)
+            pdf.set_font("Arial", size=12)
+            for alert in weather["alerts"]:
+                pdf.multi_cell(0, 10, txt=safe_text(f"- {alert}"))
+
     pdf.output(out_path)
     return out_path
 
@@ -886,17 +1343,14 @@ def main():
         st.markdown("---")
         
         # Navigation with translated options
-        page = st.radio(
-            "Navigate",
-            [
-                get_ui_text("home", st.session_state.language_code),
-                get_ui_text("disease_detection", st.session_state.language_code),
-                get_ui_text("crop_recommendation", st.session_state.language_code),
-                get_ui_text("weather_dashboard", st.session_state.language_code),
-                get_ui_text("ai_chatbot", st.session_state.language_code)
-            ],
-            label_visibility="collapsed"
-        )
+        page_keys = ["home", "disease_detection", "crop_recommendation", "weather_dashboard", "ai_chatbot"]
+        if SHOW_DIAGNOSTICS:
+            page_keys.append("diagnostics")
+        pages = [get_ui_text(key, st.session_state.language_code) for key in page_keys]
+        page = st.radio("Navigate", pages, label_visibility="collapsed")
+
+        # Translate the page's known strings in one request before rendering it
+        start_page_translations(page_keys[pages.index(page)], st.session_state.language_code)
         
         st.markdown("---")
         st.markdown(f"""
@@ -980,10 +1434,16 @@ def main():
         st.markdown(translate_text("Upload an image of your crop leaves to detect diseases or nutrient deficiencies.", st.session_state.language_code))
         
         # --- NEW: Load crop classifier model ---
-        crop_classifier_model, crop_classifier_classes = load_crop_classifier()
+        # With worker processes the workers hold the model; this process only needs its class names
+        if INFERENCE_WORKERS:
+            crop_classifier_model, crop_classifier_classes = None, load_crop_classifier_classes()
+            crop_classifier_available = crop_classifier_classes is not None
+        else:
+            crop_classifier_model, crop_classifier_classes = load_crop_classifier()
+            crop_classifier_available = crop_classifier_model is not None
 
         with st.expander("📌 Instructions", expanded=True):
-            if crop_classifier_model:
+            if crop_classifier_available:
                 st.markdown("""
                 - Upload a clear photo of the plant leaves (Apple or Corn supported)
                 - Enter your location for weather-specific advice
@@ -999,13 +1459,13 @@ def main():
         
         col1, col2 = st.columns(2)
         
-        # Initialize img and temp_image_path outside the conditional block
+        # Initialize img outside the conditional block
         img = None 
-        temp_image_path = None
+        decode_seconds = 0.0
 
         with col1:
             # --- MODIFIED: Conditional Crop Selection ---
-            if not crop_classifier_model:
+            if not crop_classifier_available:
                 st.info("Automatic crop classifier not found. Please select a crop manually.")
                 crop = st.selectbox(
                     "Select Crop",
@@ -1032,7 +1492,7 @@ def main():
                 try:
                     # Read the image content into a BytesIO object
                     image_bytes = image_file.getvalue()
-                    img = Image.open(io.BytesIO(image_bytes))
+                    img, decode_seconds = decode_uploaded_image(image_bytes)
                     
                     # Display the image using the PIL Image object
                     # Removed use_container_width=True to resolve TypeError
@@ -1044,31 +1504,28 @@ def main():
         if st.button(get_ui_text("analyze", st.session_state.language_code), type="primary", use_container_width=True):
             # Ensure both image and location are provided AND img is a valid PIL Image object
             if img is not None and location: 
-                with st.spinner(translate_text("Analyzing your crop...", st.session_state.language_code)):
+                with st.spinner(translate_text("Analyzing your crop...", st.session_state.language_code)), get_tracer().trace("analyze") as trace:
                     try:
-                        # Save the PIL Image object to a temporary file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-                            # Convert to RGB if necessary before saving
-                            if img.mode in ('RGBA', 'LA'):
-                                img = img.convert('RGB')
-                            img.save(tmp_file.name, 'JPEG')
-                            temp_image_path = tmp_file.name
+                        trace.add("decode", decode_seconds)
+                        # Fetch the weather while the models run; joined before rendering
+                        weather_future = get_weather_executor().submit(timed_call, fetch_weather_report, location)
+
+                        # Preprocess the already-decoded image once and share the array with both models
+                        with trace.stage("preprocess"):
+                            img_array = preprocess_image(img)
                         
                         # --- NEW: Two-Step Analysis ---
                         # Step 1: Classify the crop if the model is available
-                        if crop_classifier_model:
+                        if crop_classifier_available:
                             st.write("Step 1: Identifying crop type...")
-                            predicted_crop, crop_confidence = predict_crop(temp_image_path, crop_classifier_model, crop_classifier_classes)
+                            with trace.stage("crop_classification"):
+                                crop_runner = get_crop_model_runner(crop_classifier_model)
+                                crop_version = get_model_version(backend_model_path(CROP_CLASSIFIER_MODEL_PATH, INFERENCE_BACKEND))
+                                predicted_crop, crop_confidence = predict_crop(img_array, crop_runner, crop_classifier_classes, crop_version)
                             st.write(f"-> Detected Crop: **{predicted_crop}** (Confidence: {crop_confidence}%)")
 
                             if predicted_crop.lower() == 'unknown':
                                 st.error("❌ The uploaded image could not be identified as a supported crop (Apple or Corn). Please upload a different image.")
-                                # Clean up temp file before returning
-                                if temp_image_path and os.path.exists(temp_image_path):
-                                    try:
-                                        os.unlink(temp_image_path)
-                                    except Exception as e:
-                                        st.warning(f"Could not delete temporary file: {e}")
                                 return # Stop analysis
                             
                             # Set the crop for the next step
@@ -1077,25 +1534,15 @@ def main():
                         # If crop is still None (manual selection was active but nothing selected)
                         if not crop:
                             st.warning("Please select a crop to analyze.")
-                            # Clean up temp file before returning
-                            if temp_image_path and os.path.exists(temp_image_path):
-                                try:
-                                    os.unlink(temp_image_path)
-                                except Exception as e:
-                                    st.warning(f"Could not delete temporary file: {e}")
                             return
 
                         # Step 2: Run disease detection on the identified crop
                         st.write(f"Step 2: Analyzing for **{crop}** diseases...")
-                        model, class_names = load_model_and_classes(crop)
-                        pred_class, confidence = predict_disease(temp_image_path, model, class_names, crop) 
-                        
-                        # Clean up temp file after prediction
-                        if temp_image_path and os.path.exists(temp_image_path):
-                            try:
-                                os.unlink(temp_image_path)
-                            except Exception as e:
-                                st.warning(f"Could not delete temporary file: {e}")
+                        with trace.stage("disease_model_load"):
+                            disease_runner, class_names = get_disease_model_runner(crop)
+                            disease_version = get_model_version(backend_model_path(disease_model_paths(crop)[0], INFERENCE_BACKEND))
+                        with trace.stage("disease_prediction"):
+                            pred_class, confidence = predict_disease(img_array, disease_runner, class_names, crop, disease_version) 
                         
                         def normalize_key_for_details(key):
                             key = key.lower()
@@ -1121,7 +1568,11 @@ def main():
                                 "fertilizer": "General balanced fertilizer"
                             }
                         
-                        forecast = get_weather_report(location)
+                        with trace.stage("weather_wait"):
+                            (forecast, weather_error), weather_seconds = weather_future.result()
+                        trace.add("weather", weather_seconds)
+                        if weather_error:
+                            st.error(weather_error)
                         
                         if forecast:
                             status = "Healthy" if "healthy" in pred_class.lower() else "Diseased"
@@ -1176,6 +1627,7 @@ def main():
                                         </div>
                                     </div>
                                     <p><strong>Advice:</strong> {forecast['advice']}</p>
+                                    {"".join(f"<p>⚠️ {alert}</p>" for alert in forecast.get('alerts', []))}
                                 </div>
                                 """, unsafe_allow_html=True)
                             
@@ -1190,7 +1642,8 @@ def main():
                                 "weather": forecast,
                             }
 
-                            pdf_path = generate_pdf(report_data, temp_image_path)
+                            with trace.stage("pdf"):
+                                pdf_path = generate_pdf(report_data, img)
                             
                             with open(pdf_path, "rb") as f:
                                 st.download_button(
@@ -1213,6 +1666,10 @@ def main():
             else:
                 st.warning("Please upload an image and enter your location to analyze.")
 
+        if batcher_stats():
+            with st.expander("⚙️ Inference Stats"):
+                display_inference_stats()
+
     elif page == get_ui_text("crop_recommendation", st.session_state.language_code):
         st.header(translate_text("🌱 Smart Crop Recommendation", st.session_state.language_code))
         st.markdown(translate_text("Get personalized crop suggestions based on your soil conditions and climate.", st.session_state.language_code))
@@ -1245,13 +1702,6 @@ def main():
         if st.button(get_ui_text("get_recommendation", st.session_state.language_code), type="primary", use_container_width=True):
             with st.spinner(translate_text("Analyzing your soil and climate...", st.session_state.language_code)):
                 try:
-                    @st.cache_resource
-                    def load_crop_recommendation_model():
-                        """Load and cache crop recommendation model"""
-                        if not os.path.exists("models/crop_recommendation_model.pkl"):
-                            return None
-                        return joblib.load("models/crop_recommendation_model.pkl")
-                    
                     model = load_crop_recommendation_model()
                     if model is None:
                         st.error("Crop recommendation model not found. Please ensure the model file exists in the 'models' directory.")
@@ -1282,6 +1732,9 @@ def main():
     elif page == get_ui_text("ai_chatbot", st.session_state.language_code):
         display_chatbot()
 
+    elif page == get_ui_text("diagnostics", st.session_state.language_code):
+        display_diagnostics()
+
 # Chatbot Knowledge Base
 CHATBOT_KNOWLEDGE = {
     "greetings": {
@@ -0,0 +1,138 @@
+"""
+AgriLens request tracing
+Lightweight per-stage timing for request handlers. Each request records the
+duration of its stages; the tracer aggregates them into fixed-bucket
+histograms with percentiles over recent samples, and keeps recent traces for
+export.
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+
+def timed_call(fn, *args, **kwargs):
+    """Calls `fn` and returns (result, seconds), e.g. to time work submitted to another thread."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+class StageHistogram:
+    """Fixed-bucket latency histogram plus a window of recent samples for percentiles."""
+    def __init__(self, window=2048):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, duration_ms):
+        self.counts[next(i for i, bound in enumerate(BUCKETS_MS) if duration_ms <= bound)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.recent.append(duration_ms)
+
+    def summary(self):
+        recent = np.asarray(self.recent) if self.recent else np.zeros(1)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(float(np.percentile(recent, 50)), 2),
+            "p95_ms": round(float(np.percentile(recent, 95)), 2),
+            "p99_ms": round(float(np.percentile(recent, 99)), 2),
+            "max_ms": round(self.max_ms, 2)
+        }
+
+class RequestTrace:
+    """The stage timings of one request."""
+    def __init__(self, name):
+        self.name = name
+        self.request_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.stages = [] # (stage, duration_ms) in execution order
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, stage):
+        """Times the enclosed block as one stage of this request."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage, seconds):
+        """Records a stage timed elsewhere, e.g. work done before the request started."""
+        self.stages.append((stage, seconds * 1000.0))
+
+    def total_ms(self):
+        return (time.perf_counter() - self._start) * 1000.0
+
+class Tracer:
+    """
+    Collects RequestTraces into per-stage histograms and keeps the most recent
+    traces for export. With `log_path`, finished traces are also appended as JSON lines.
+    """
+    def __init__(self, max_traces=1000, log_path=None):
+        self.histograms = {}
+        self.traces = deque(maxlen=max_traces)
+        self.log_path = log_path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, name):
+        """Starts a request trace and records it when the block exits, even on early return."""
+        request = RequestTrace(name)
+        try:
+            yield request
+        finally:
+            self.finish(request)
+
+    def finish(self, request):
+        request.add("total", request.total_ms() / 1000.0)
+        with self._lock:
+            for stage, duration_ms in request.stages:
+                self.histograms.setdefault((request.name, stage), StageHistogram()).add(duration_ms)
+            self.traces.append(request)
+            if self.log_path:
+                with open(self.log_path, "a") as f:
+                    for record in self._records(request):
+                        f.write(json.dumps(record) + "\n")
+
+    @staticmethod
+    def _records(request):
+        return [
+            {"request_id": request.request_id, "request": request.name, "started_at": request.started_at,
+             "stage": stage, "duration_ms": round(duration_ms, 3)}
+            for stage, duration_ms in request.stages
+        ]
+
+    def summary(self):
+        """Returns one row of histogram statistics per (request, stage)."""
+        with self._lock:
+            return [
+                {"request": name, "stage": stage, **histogram.summary()}
+                for (name, stage), histogram in self.histograms.items()
+            ]
+
+    def bucket_counts(self, name, stage):
+        """Returns (bucket label, count) pairs for one stage's histogram."""
+        with self._lock:
+            histogram = self.histograms.get((name, stage))
+            counts = list(histogram.counts) if histogram else [0] * len(BUCKETS_MS)
+        labels = [f"≤{bound:g} ms" if bound != float("inf") else f">{BUCKETS_MS[-2]:g} ms" for bound in BUCKETS_MS]
+        return list(zip(labels, counts))
+
+    def export_records(self):
+        """Returns every stage of every kept trace as flat records for offline analysis."""
+        with self._lock:
+            return [record for request in self.traces for record in self._records(request)]
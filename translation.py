@@ -0,0 +1,234 @@
+"""
+AgriLens translation batching
+Translates many UI strings in one request per language instead of one per
+string. Each page's strings are recorded as it renders (in any language,
+including English), so the next render of that page in another language
+translates every missing string in a single batched call up front, and the
+per-string lookups during rendering are then cache hits.
+
+Static UI strings are served from precompiled per-language catalogs
+(built by build_translation_catalog.py) without any network call; online
+translation is only needed for dynamic text.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Strings are joined one per line; Google Translate keeps line breaks
+SEPARATOR = "\n"
+
+# Keeps each batched request under the service's per-request text limit
+MAX_BATCH_CHARS = 4500
+
+# Page vocabularies skip long text (chat answers, generated advice) and stop growing at this size
+MAX_RECORDED_CHARS = 300
+MAX_PAGE_STRINGS = 500
+
+def catalog_path(directory, language):
+    return os.path.join(directory, f"{language}.json")
+
+def load_catalogs(directory, languages):
+    """Returns {language: {English text: translation}} for the catalogs present in `directory`."""
+    catalogs = {}
+    for language in languages:
+        path = catalog_path(directory, language)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                catalogs[language] = json.load(f)
+    return catalogs
+
+def write_catalog(path, entries):
+    """Writes a catalog as one compact JSON object, sorted so rebuilds give small diffs."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(entries.items())), f, ensure_ascii=False, indent=0, separators=(",", ":"))
+        f.write("\n")
+
+class BatchTranslator:
+    """
+    Process-wide translation cache with page-level batching. `translate` is a
+    callable (text, dest, src) -> translated text that makes one upstream
+    request, or None to translate from `catalogs` only ({language: {text:
+    translation}}, see load_catalogs), leaving uncatalogued text as is.
+
+    Translations are keyed by (text, src, dest); src "auto" marks English UI
+    text, which is also looked up in the catalogs and recorded per page.
+    They are kept in memory, least recently used first out once `max_entries`
+    is reached, and with `disk_cache` (a TranslationDiskCache) shared with
+    other processes and restarts.
+    """
+    def __init__(self, translate, max_entries=20000, max_batch_chars=MAX_BATCH_CHARS, catalogs=None, disk_cache=None):
+        self._translate = translate
+        self.catalogs = catalogs or {}
+        self.disk_cache = disk_cache
+        self.max_entries = max_entries
+        self.max_batch_chars = max_batch_chars
+        self._cache = OrderedDict() # (text, src, dest) -> translation
+        self._vocabulary = {} # page -> {text: None}, in first-seen order
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._catalog_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._requests = 0
+        self._batched = 0
+        self._batch_fallbacks = 0
+
+    def _catalogued(self, text, src, dest):
+        return self.catalogs.get(dest, {}).get(text) if src == "auto" else None
+
+    def _cached(self, text, src, dest):
+        """Returns the catalogued or in-memory translation, or None."""
+        translation = self._catalogued(text, src, dest)
+        if translation is not None:
+            return translation
+        with self._lock:
+            translation = self._cache.get((text, src, dest))
+            if translation is not None:
+                self._cache.move_to_end((text, src, dest))
+            return translation
+
+    def _remember(self, translations, src, dest):
+        with self._lock:
+            for text, translation in translations.items():
+                self._cache[(text, src, dest)] = translation
+                self._cache.move_to_end((text, src, dest))
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _store(self, translations, src, dest):
+        """Keeps new upstream translations in memory and on disk."""
+        self._remember(translations, src, dest)
+        if self.disk_cache:
+            self.disk_cache.put_many(translations, src, dest)
+
+    def _from_disk(self, texts, src, dest):
+        if not (self.disk_cache and texts):
+            return {}
+        found = self.disk_cache.get_many(texts, src, dest)
+        self._remember(found, src, dest)
+        with self._lock:
+            self._disk_hits += len(found)
+        return found
+
+    def _request(self, text, src, dest):
+        with self._lock:
+            self._requests += 1
+        return self._translate(text, dest, src)
+
+    def start_page(self, page, dest, extra=()):
+        """
+        Marks the start of a page render in this thread: later translate()
+        calls for UI text are recorded under `page`, and every string the page
+        used before (plus `extra`) that is not yet translated into `dest` is
+        fetched now.
+        """
+        self._local.page = page
+        with self._lock:
+            known = list(self._vocabulary.get(page, ()))
+        self.translate_many([*known, *extra], dest)
+
+    def translate(self, text, dest, src="auto"):
+        """Returns the translation of one string, requesting it on a cache miss."""
+        page = getattr(self._local, "page", None)
+        if src == "auto" and page is not None and len(text) <= MAX_RECORDED_CHARS:
+            with self._lock:
+                strings = self._vocabulary.setdefault(page, {})
+                if len(strings) < MAX_PAGE_STRINGS:
+                    strings[text] = None
+        if dest == src or (src == "auto" and dest == "en") or not text.strip():
+            return text
+
+        translation = self._catalogued(text, src, dest)
+        if translation is not None:
+            with self._lock:
+                self._catalog_hits += 1
+            return translation
+        translation = self._cached(text, src, dest)
+        if translation is not None:
+            with self._lock:
+                self._hits += 1
+            return translation
+        translation = self._from_disk([text], src, dest).get(text)
+        if translation is not None:
+            return translation
+
+        with self._lock:
+            self._misses += 1
+        if self._translate is None:
+            return text
+        translation = self._request(text, src, dest)
+        self._store({text: translation}, src, dest)
+        return translation
+
+    def translate_many(self, texts, dest, src="auto"):
+        """
+        Translates the distinct, not yet cached `texts` into `dest` with one
+        request per MAX_BATCH_CHARS of single-line text (multi-line text gets
+        its own request), and returns {text: translation}.
+        If the service does not return one line per input line, the batch is
+        translated string by string instead.
+        """
+        texts = list(dict.fromkeys(texts))
+        if dest == src or (src == "auto" and dest == "en"):
+            return {text: text for text in texts}
+        missing = [text for text in texts if text.strip() and self._cached(text, src, dest) is None]
+        found = self._from_disk(missing, src, dest)
+        missing = [text for text in missing if text not in found]
+        with self._lock:
+            self._misses += len(missing)
+        if self._translate is None:
+            missing = []
+
+        for text in missing:
+            if SEPARATOR in text: # Multi-line text cannot share a batch
+                self._store({text: self._request(text, src, dest)}, src, dest)
+        for batch in self._batches([text for text in missing if SEPARATOR not in text]):
+            if len(batch) == 1:
+                self._store({batch[0]: self._request(batch[0], src, dest)}, src, dest)
+                continue
+            lines = self._request(SEPARATOR.join(batch), src, dest).split(SEPARATOR)
+            with self._lock:
+                self._batched += len(batch)
+            if len(lines) != len(batch):
+                with self._lock:
+                    self._batch_fallbacks += 1
+                lines = [self._request(text, src, dest) for text in batch]
+            self._store({text: line.strip() for text, line in zip(batch, lines)}, src, dest)
+        return {text: self._cached(text, src, dest) or text for text in texts}
+
+    def _batches(self, texts):
+        batch, size = [], 0
+        for text in texts:
+            if batch and size + len(text) + len(SEPARATOR) > self.max_batch_chars:
+                yield batch
+                batch, size = [], 0
+            batch.append(text)
+            size += len(text) + len(SEPARATOR)
+        if batch:
+            yield batch
+
+    def stats(self):
+        with self._lock:
+            served = self._catalog_hits + self._hits + self._disk_hits
+            lookups = served + self._misses
+            stats = {
+                "catalog_entries": sum(len(catalog) for catalog in self.catalogs.values()),
+                "entries": len(self._cache),
+                "pages": len(self._vocabulary),
+                "page_strings": sum(len(strings) for strings in self._vocabulary.values()),
+                "catalog_hits": self._catalog_hits,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+                "upstream_requests": self._requests,
+                "batched_strings": self._batched,
+                "batch_fallbacks": self._batch_fallbacks
+            }
+        if self.disk_cache:
+            stats.update(self.disk_cache.stats())
+        return stats
@@ -0,0 +1,98 @@
+"""
+AgriLens persistent translation cache
+SQLite store of translations shared by every worker process and surviving
+restarts, bounded to a maximum number of entries with least-recently-used
+eviction.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK = 500
+
+# Puts between checks of the entry bound
+EVICT_EVERY = 100
+
+class TranslationDiskCache:
+    """
+    Translations keyed by (text, src, dest), with the time each was last
+    used. Opens a short-lived connection per call, so one instance can be
+    used from any thread.
+    """
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self._evictions = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL") # Readers never block the writer
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "text TEXT NOT NULL, src TEXT NOT NULL, dest TEXT NOT NULL, translation TEXT NOT NULL, "
+                "last_used REAL NOT NULL, PRIMARY KEY (text, src, dest))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        """Yields a connection inside a transaction, then closes it (sqlite3's own `with` only commits)."""
+        with closing(sqlite3.connect(self.path, timeout=10)) as conn, conn:
+            yield conn
+
+    def get_many(self, texts, src, dest):
+        """Returns {text: translation} for the stored `texts`, marking them as recently used."""
+        found = {}
+        texts = list(texts)
+        now = time.time()
+        with self._connect() as conn:
+            for start in range(0, len(texts), LOOKUP_CHUNK):
+                chunk = texts[start:start + LOOKUP_CHUNK]
+                found.update(conn.execute(
+                    f"SELECT text, translation FROM translations WHERE src = ? AND dest = ? "
+                    f"AND text IN ({', '.join('?' * len(chunk))})",
+                    (src, dest, *chunk)
+                ).fetchall())
+            if found:
+                conn.executemany(
+                    "UPDATE translations SET last_used = ? WHERE text = ? AND src = ? AND dest = ?",
+                    [(now, text, src, dest) for text in found]
+                )
+        return found
+
+    def put_many(self, translations, src, dest):
+        """Stores {text: translation}, evicting the least recently used entries beyond max_entries."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations (text, src, dest, translation, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(text, src, dest, translation, now) for text, translation in translations.items()]
+            )
+        with self._lock:
+            self._puts_since_evict += len(translations)
+            if self._puts_since_evict < EVICT_EVERY:
+                return
+            self._puts_since_evict = 0
+        self._evict()
+
+    def _evict(self):
+        with self._connect() as conn:
+            excess = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM translations WHERE rowid IN "
+                    "(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+        if excess > 0:
+            with self._lock:
+                self._evictions += excess
+
+    def stats(self):
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        with self._lock:
+            return {"disk_entries": entries, "disk_evictions": self._evictions}
@@ -0,0 +1,343 @@
+"""
+AgriLens weather data
+OpenWeather fetching and parsing without Streamlit dependencies. A single
+WeatherStore fetches each endpoint once per location per TTL and shares the
+normalized result with the dashboard, the disease report and the PDF.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from alert_rules import describe_alert, evaluate_rules
+from locations import LocationResolver, direct_location
+from weather_cache import WeatherDiskCache
+from weather_client import WeatherClient
+from weather_history import WeatherHistory
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org"
+
+# Weather endpoints under the API root
+ENDPOINT_PATHS = {"weather": "data/2.5/weather", "forecast": "data/2.5/forecast"}
+
+# Forecast entries are 3-hourly, so the next 24 hours are the first 8 entries
+FORECAST_STEPS_24H = 8
+
+# OpenWeather condition groups and descriptions, title-cased as the dashboard shows them,
+# so build_translation_catalog.py can pre-translate them
+WEATHER_CONDITIONS = (
+    "Thunderstorm", "Drizzle", "Rain", "Snow", "Mist", "Smoke", "Haze", "Dust", "Fog", "Sand", "Ash",
+    "Squall", "Tornado", "Clear", "Clouds",
+    "Thunderstorm With Light Rain", "Thunderstorm With Rain", "Thunderstorm With Heavy Rain",
+    "Light Thunderstorm", "Heavy Thunderstorm", "Ragged Thunderstorm", "Thunderstorm With Light Drizzle",
+    "Thunderstorm With Drizzle", "Thunderstorm With Heavy Drizzle",
+    "Light Intensity Drizzle", "Heavy Intensity Drizzle", "Light Intensity Drizzle Rain", "Drizzle Rain",
+    "Heavy Intensity Drizzle Rain", "Shower Rain And Drizzle", "Heavy Shower Rain And Drizzle", "Shower Drizzle",
+    "Light Rain", "Moderate Rain", "Heavy Intensity Rain", "Very Heavy Rain", "Extreme Rain", "Freezing Rain",
+    "Light Intensity Shower Rain", "Shower Rain", "Heavy Intensity Shower Rain", "Ragged Shower Rain",
+    "Light Snow", "Heavy Snow", "Sleet", "Light Shower Sleet", "Shower Sleet", "Light Rain And Snow",
+    "Rain And Snow", "Light Shower Snow", "Shower Snow", "Heavy Shower Snow",
+    "Sand/Dust Whirls", "Volcanic Ash", "Squalls",
+    "Clear Sky", "Few Clouds", "Scattered Clouds", "Broken Clouds", "Overcast Clouds"
+)
+
+def parse_current_weather(data):
+    """Normalizes an OpenWeather /weather response."""
+    return {
+        "location": data['name'],
+        "country": data['sys']['country'],
+        "temperature": data['main']['temp'],
+        "feels_like": data['main']['feels_like'],
+        "humidity": data['main']['humidity'],
+        "pressure": data['main']['pressure'],
+        "visibility": data.get('visibility', 0) / 1000,  # Convert to km
+        "wind_speed": data['wind']['speed'],
+        "wind_direction": data['wind'].get('deg', 0),
+        "weather_main": data['weather'][0]['main'],
+        "weather_description": data['weather'][0]['description'],
+        "weather_icon": data['weather'][0]['icon'],
+        "clouds": data['clouds']['all'],
+        "sunrise": datetime.fromtimestamp(data['sys']['sunrise']),
+        "sunset": datetime.fromtimestamp(data['sys']['sunset']),
+        "timestamp": datetime.now()
+    }
+
+def parse_forecast(data):
+    """
+    Parses an OpenWeather /forecast response into one DataFrame with a row per
+    3-hour step and typed columns, built once per fetch. Charts, tables and
+    alerts all read it; it is shared, so treat it as read-only.
+    """
+    items = data['list']
+    forecast = pd.DataFrame({
+        'datetime': pd.to_datetime([datetime.fromtimestamp(item['dt']) for item in items]),
+        'temperature': np.array([item['main']['temp'] for item in items], dtype=np.float64),
+        'humidity': np.array([item['main']['humidity'] for item in items], dtype=np.float64),
+        'pressure': np.array([item['main']['pressure'] for item in items], dtype=np.float64),
+        'weather': [item['weather'][0]['description'] for item in items],
+        'weather_icon': [item['weather'][0]['icon'] for item in items],
+        'wind_speed': np.array([item['wind']['speed'] for item in items], dtype=np.float64),
+        'clouds': np.array([item['clouds']['all'] for item in items], dtype=np.float64),
+        'rain': np.array([item.get('rain', {}).get('3h', 0) for item in items], dtype=np.float64) # Rain volume in the 3 hours
+    })
+    forecast['label'] = forecast['datetime'].dt.strftime('%m/%d %H:%M') # Chart and table axis label
+    return forecast
+
+def summarize_forecast(forecast, location):
+    """Builds the simplified weather report used for disease and crop advice, and the PDF."""
+    # Check for rain in the next 24 hours
+    next_24h = forecast.iloc[:FORECAST_STEPS_24H]
+    rainy = next_24h['weather'].str.contains("rain", case=False).to_numpy()
+    # Reported in UTC like the forecast's dt_txt; the datetime column holds local times
+    rains = [
+        datetime.fromtimestamp(moment.timestamp(), timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        for moment in next_24h['datetime'][rainy].dt.to_pydatetime()
+    ]
+    now = forecast.iloc[0]
+
+    report = {
+        "location": location,
+        "next_24h_rain": len(rains) > 0,
+        "rain_times": rains,
+        "temperature": f"{now['temperature']:g} °C",
+        "humidity": f"{now['humidity']:g}%",
+        "weather_icon": now['weather_icon'],
+        "alerts": [describe_alert(alert) for alert in evaluate_rules({location: forecast})]
+    }
+
+    report["advice"] = (
+        "🌧️ Rain expected — watch for fungal issues and plan irrigation accordingly!"
+        if report["next_24h_rain"]
+        else "☀️ Dry weather — monitor irrigation needs and conserve water."
+    )
+    return report
+
+class WeatherStore:
+    """
+    Shared cache of parsed OpenWeather responses, fetched at most once per
+    (endpoint, location) per `ttl` seconds through `client` (a WeatherClient).
+    Concurrent requests for the same key wait for a single upstream call.
+
+    Entries older than `ttl` but younger than `max_stale` are served at once
+    while one background refresh revalidates them (stale-while-revalidate).
+    With `disk_cache` (a WeatherDiskCache), raw responses persist across
+    restarts and are shared with other processes, whose refreshes are
+    coordinated by a lease. With `resolver` (a LocationResolver), entries are
+    keyed and queried by geocoded place instead of by normalized name. With
+    `history` (a WeatherHistory), every upstream fetch is also appended to
+    the long-range time series. Fetch errors are raised, not cached. At most
+    `max_entries` entries are kept in memory, least recently used first out.
+    """
+    def __init__(self, client, ttl=300, disk_cache=None, max_stale=86400, refresh_lease=30, resolver=None,
+                 history=None, max_entries=1024):
+        self.client = client
+        self.resolver = resolver
+        self.history = history
+        self.ttl = ttl
+        self.disk_cache = disk_cache
+        self.max_stale = max_stale
+        self.refresh_lease = refresh_lease
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # (endpoint, location key) -> (fetched_at, value), least recent first
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._refresh_until = {} # key -> time until which a refresh is in flight or backing off
+        self._fetches = 0
+        self._hits = 0
+        self._stale_hits = 0
+        self._disk_hits = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+
+    def resolve(self, location):
+        """Returns the ResolvedLocation whose key and query parameters a location's entries use."""
+        if self.resolver:
+            return self.resolver.resolve(location)
+        return direct_location(location)
+
+    def _remember(self, key, payload, parse, fetched_at):
+        value = parse(payload)
+        with self._lock:
+            self._entries[key] = (fetched_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._refresh_until.pop(evicted, None)
+                lock = self._fetch_locks.get(evicted)
+                if lock is not None and not lock.locked():
+                    del self._fetch_locks[evicted]
+        return value
+
+    def _lookup(self, key, parse):
+        """Returns the newest (fetched_at, value) from memory or disk, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry
+
+        # Another process may have refreshed the entry, or this process just restarted
+        if self.disk_cache:
+            stored = self.disk_cache.get(*key)
+            if stored and (entry is None or stored[1] > entry[0]):
+                payload, fetched_at = stored
+                with self._lock:
+                    self._disk_hits += 1
+                return fetched_at, self._remember(key, payload, parse, fetched_at)
+        return entry
+
+    def _fetch(self, key, params, parse):
+        payload = self.client.get_json(ENDPOINT_PATHS[key[0]], params)
+        fetched_at = time.time()
+        if self.disk_cache:
+            self.disk_cache.put(*key, payload, fetched_at)
+        value = self._remember(key, payload, parse, fetched_at)
+        if self.history:
+            self.history.record(*key, value)
+        return value
+
+    def _get(self, endpoint, location, parse):
+        place = self.resolve(location)
+        key = (endpoint, place.key)
+        entry = self._lookup(key, parse)
+        if entry:
+            fetched_at, value = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                with self._lock:
+                    self._hits += 1
+                return value
+            if age < self.max_stale:
+                with self._lock:
+                    self._stale_hits += 1
+                self._refresh_in_background(key, place.params, parse)
+                return value
+
+        with self._lock:
+            if key not in self._fetch_locks and len(self._fetch_locks) >= self.max_entries:
+                # Drop idle locks of keys with no entry (e.g. fetches that failed)
+                for idle in [k for k, lock in self._fetch_locks.items() if k not in self._entries and not lock.locked()]:
+                    del self._fetch_locks[idle]
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+        with fetch_lock:
+            entry = self._lookup(key, parse)
+            if entry and time.time() - entry[0] < self.ttl:
+                with self._lock:
+                    self._hits += 1
+                return entry[1]
+
+            value = self._fetch(key, place.params, parse)
+            with self._lock:
+                self._fetches += 1
+        return value
+
+    def _refresh_in_background(self, key, params, parse):
+        """Starts one refresh per stale entry across threads and, with a disk cache, across processes."""
+        now = time.time()
+        with self._lock:
+            if self._refresh_until.get(key, 0) > now:
+                return
+            self._refresh_until[key] = now + self.refresh_lease
+        if self.disk_cache and not self.disk_cache.claim_refresh(*key, self.refresh_lease):
+            return # Another process is refreshing; its result reaches us through the disk tier
+        threading.Thread(
+            target=self._refresh, args=(key, params, parse), name="weather-refresh", daemon=True
+        ).start()
+
+    def _refresh(self, key, params, parse):
+        try:
+            self._fetch(key, params, parse)
+        except Exception:
+            # Keep serving the stale entry; the lease expiry spaces out retries
+            with self._lock:
+                self._refresh_errors += 1
+            return
+        with self._lock:
+            self._refreshes += 1
+            self._fetches += 1
+            self._refresh_until.pop(key, None)
+
+    def current(self, location):
+        """Returns the parsed current weather for a location."""
+        return self._get("weather", location, parse_current_weather)
+
+    def forecast(self, location):
+        """Returns the parsed 5-day forecast for a location. Treat it as read-only: it is shared."""
+        return self._get("forecast", location, parse_forecast)
+
+    def report(self, location):
+        """Returns the simplified weather report, derived from the shared forecast."""
+        return summarize_forecast(self.forecast(location), location)
+
+    def history_for(self, location, start, end, resolution="day", kind="forecast"):
+        """Returns downsampled readings for a location from the history, or None without one."""
+        if not self.history:
+            return None
+        return self.history.query(self.resolve(location).key, start, end, resolution, kind)
+
+    def stats(self):
+        with self._lock:
+            served = self._hits + self._stale_hits
+            lookups = served + self._fetches - self._refreshes
+            stats = {
+                "entries": len(self._entries),
+                "upstream_fetches": self._fetches,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "disk_hits": self._disk_hits,
+                "background_refreshes": self._refreshes,
+                "refresh_errors": self._refresh_errors,
+                "hit_rate": round(served / lookups, 3) if lookups else 0.0
+            }
+        if self.disk_cache:
+            stats.update(self.disk_cache.stats())
+        if self.resolver:
+            stats.update(self.resolver.stats())
+        if self.history:
+            stats.update(self.history.stats())
+        return stats
+
+def build_weather_store(api_key, base_url=DEFAULT_BASE_URL, ttl=300, max_stale=86400, cache_db=None,
+                        geocode=True, timeout=(3.05, 10), retries=2, history_db=None, max_entries=1024):
+    """
+    Builds the full weather stack: pooled client, optional SQLite cache and
+    geocode cache (`cache_db`), optional reading history (`history_db`), and
+    location resolution. `base_url` can point at a stand-in server such as
+    benchmarks/openweather_standin.py.
+    """
+    client = WeatherClient(base_url, api_key, timeout=timeout, retries=retries)
+    disk_cache = WeatherDiskCache(cache_db) if cache_db else None
+    resolver = LocationResolver(client, cache_db) if geocode else None
+    history = WeatherHistory(history_db) if history_db else None
+    return WeatherStore(client, ttl=ttl, disk_cache=disk_cache, max_stale=max_stale, resolver=resolver, history=history,
+                        max_entries=max_entries)
+
+async def _fetch_location(store, location, semaphore):
+    async with semaphore:
+        try:
+            current, forecast = await asyncio.gather(
+                asyncio.to_thread(store.current, location),
+                asyncio.to_thread(store.forecast, location)
+            )
+        except Exception as e:
+            return {"location": location, "current": None, "forecast": None, "error": str(e)}
+    return {"location": location, "current": current, "forecast": forecast, "error": None}
+
+async def fetch_locations_async(store, locations, concurrency=8):
+    """
+    Fetches current weather and forecast for many locations concurrently,
+    with at most `concurrency` locations in flight. Each result carries its
+    own error, so one failing farm does not fail the round.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(_fetch_location(store, location, semaphore) for location in locations))
+
+def fetch_locations(store, locations, concurrency=8):
+    """Synchronous entry point for fetch_locations_async, for callers without an event loop."""
+    return asyncio.run(fetch_locations_async(store, locations, concurrency))
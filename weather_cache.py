@@ -0,0 +1,76 @@
+"""
+AgriLens persistent weather cache
+SQLite store of raw OpenWeather responses shared by every worker process and
+surviving restarts. A refresh lease per entry lets exactly one process
+revalidate a stale entry while the others keep serving it.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+class WeatherDiskCache:
+    """
+    Raw weather payloads keyed by (endpoint, normalized location), with their
+    fetch time. Opens a short-lived connection per call, so one instance can
+    be used from any thread.
+    """
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL") # Readers never block the writer
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS weather ("
+                "endpoint TEXT NOT NULL, location TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "payload TEXT NOT NULL, refreshing_until REAL, PRIMARY KEY (endpoint, location))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Yields a connection inside a transaction, then closes it (sqlite3's own `with` only commits)."""
+        with closing(sqlite3.connect(self.path, timeout=10)) as conn, conn:
+            yield conn
+
+    def get(self, endpoint, location):
+        """Returns (payload, fetched_at) for an entry, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, fetched_at FROM weather WHERE endpoint = ? AND location = ?",
+                (endpoint, location)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, endpoint, location, payload, fetched_at=None):
+        """Stores a payload and releases any refresh lease on it."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO weather (endpoint, location, fetched_at, payload, refreshing_until) "
+                "VALUES (?, ?, ?, ?, NULL)",
+                (endpoint, location, fetched_at or time.time(), json.dumps(payload))
+            )
+
+    def claim_refresh(self, endpoint, location, lease_seconds=30):
+        """
+        Atomically takes the refresh lease on an entry. Returns False if another
+        process or thread holds an unexpired lease. A lease left by a failed
+        refresh simply expires, which also spaces out retries against a down upstream.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE weather SET refreshing_until = ? WHERE endpoint = ? AND location = ? "
+                "AND (refreshing_until IS NULL OR refreshing_until < ?)",
+                (now + lease_seconds, endpoint, location, now)
+            )
+            return cursor.rowcount == 1
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, oldest = conn.execute("SELECT COUNT(*), MIN(fetched_at) FROM weather").fetchone()
+        return {
+            "disk_entries": entries,
+            "oldest_entry_age_s": round(time.time() - oldest) if oldest else 0
+        }
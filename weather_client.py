@@ -0,0 +1,181 @@
+"""
+AgriLens weather HTTP client
+A shared OpenWeather client: pooled keep-alive connections, connect/read
+timeouts, bounded retries with exponential backoff, a circuit breaker that
+fails fast while the upstream is down, and per-endpoint latency/error metrics.
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Upstream statuses worth retrying; other 4xx (e.g. unknown city) fail immediately
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without calling the upstream while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures and rejects
+    calls for `reset_timeout` seconds, then lets a single trial call through
+    (half-open); its success closes the circuit again.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._opens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """Raises CircuitOpenError if the call should not reach the upstream."""
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half-open" and self._trial_in_flight):
+                raise CircuitOpenError("Weather service temporarily unavailable (circuit open)")
+            if state == "half-open":
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # A failed half-open trial reopens the circuit; otherwise open once the threshold is hit
+            if self._trial_in_flight or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opens += 1
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self._failures, "opens": self._opens}
+
+class EndpointMetrics:
+    """Request, error and latency counters for one endpoint."""
+    def __init__(self, window=1024):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.last_error = ""
+        self.latencies = deque(maxlen=window)
+
+    def summary(self):
+        latencies = np.asarray(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "error_rate": round(self.errors / self.requests, 3) if self.requests else 0.0,
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+            "max_ms": round(float(latencies.max()) * 1000, 1),
+            "last_error": self.last_error
+        }
+
+class WeatherClient:
+    """
+    OpenWeather JSON client shared by all sessions. `timeout` is the
+    (connect, read) pair in seconds applied to every attempt; `retries` bounds
+    retries of connection errors, read timeouts and RETRY_STATUSES.
+    """
+    def __init__(self, base_url, api_key, timeout=(3.05, 10), retries=2, backoff=0.5,
+                 pool_size=20, failure_threshold=5, reset_timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=("GET",),
+            raise_on_status=False # Return the final response so raise_for_status reports it
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _endpoint_metrics(self, endpoint):
+        return self._metrics.setdefault(endpoint, EndpointMetrics())
+
+    def get_json(self, endpoint, params):
+        """GETs `<base_url>/<endpoint>` with the API key and metric units, and returns the decoded JSON."""
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            with self._lock:
+                self._endpoint_metrics(endpoint).rejected += 1
+            raise
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                f"{self.base_url}/{endpoint}",
+                params={**params, "appid": self.api_key, "units": "metric"},
+                timeout=self.timeout
+            )
+            response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            status = getattr(e.response, "status_code", None)
+            # A client error such as an unknown city says nothing about upstream health
+            if status is not None and status < 500 and status != 429:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            self._record(endpoint, time.perf_counter() - start, error=e)
+            raise
+        except Exception as e:
+            # Anything else (e.g. a non-JSON body, a plain ValueError before requests 2.27) is an
+            # upstream failure too; recording it also ends a half-open trial instead of leaving it in flight
+            self.breaker.record_failure()
+            self._record(endpoint, time.perf_counter() - start, error=e)
+            raise
+
+        self.breaker.record_success()
+        self._record(endpoint, time.perf_counter() - start)
+        return data
+
+    def _record(self, endpoint, seconds, error=None):
+        with self._lock:
+            metrics = self._endpoint_metrics(endpoint)
+            metrics.requests += 1
+            metrics.latencies.append(seconds)
+            if error is not None:
+                metrics.errors += 1
+                metrics.last_error = type(error).__name__
+
+    def stats(self):
+        """Returns one row of metrics per endpoint, plus the circuit breaker state."""
+        with self._lock:
+            endpoints = [{"endpoint": name, **metrics.summary()} for name, metrics in self._metrics.items()]
+        return {"circuit": self.breaker.stats(), "endpoints": endpoints}
@@ -0,0 +1,124 @@
+"""
+AgriLens weather history
+Time-series store of every fetched weather reading in an indexed SQLite
+table, so long-range trends (e.g. daily min/max temperature and rainfall
+over a season) are answered by one downsampling query instead of refetching.
+Forecast rows keep the latest forecast made for each timestamp; current
+conditions are kept as observed rows.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# Bucket sizes for downsampled queries
+RESOLUTIONS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+COLUMNS = ("temperature", "humidity", "pressure", "wind_speed", "rain", "clouds")
+
+class WeatherHistory:
+    """
+    Readings keyed by (location key, kind, unix time), where kind is
+    "forecast" or "observed". The primary key doubles as the range-query
+    index. Opens a short-lived connection per call, so it is thread-safe.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._rows_written = 0
+        self._write_errors = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                "location TEXT NOT NULL, kind TEXT NOT NULL, ts INTEGER NOT NULL, "
+                "temperature REAL, humidity REAL, pressure REAL, wind_speed REAL, rain REAL, clouds REAL, "
+                "recorded_at INTEGER NOT NULL, PRIMARY KEY (location, kind, ts)) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Yields a connection inside a transaction, then closes it (sqlite3's own `with` only commits)."""
+        with closing(sqlite3.connect(self.path, timeout=10)) as conn, conn:
+            yield conn
+
+    def _write(self, rows):
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO readings "
+                    "(location, kind, ts, temperature, humidity, pressure, wind_speed, rain, clouds, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except sqlite3.Error:
+            # History is best-effort; a locked or full disk must not fail the weather request
+            with self._lock:
+                self._write_errors += 1
+            return
+        with self._lock:
+            self._rows_written += len(rows)
+
+    def record_forecast(self, location, forecast):
+        """Stores a parsed forecast DataFrame, replacing older forecasts for the same timestamps."""
+        now = int(time.time())
+        # The datetime column holds local wall-clock times; rows store epoch seconds
+        timestamps = [int(moment.timestamp()) for moment in forecast['datetime'].dt.to_pydatetime()]
+        values = forecast[list(COLUMNS)].to_numpy(dtype="float64")
+        self._write([
+            (location, "forecast", ts, *map(float, row), now)
+            for ts, row in zip(timestamps, values)
+        ])
+
+    def record_current(self, location, current):
+        """Stores a parsed current-conditions reading as an observed row."""
+        now = int(time.time())
+        ts = int(current['timestamp'].timestamp()) // 60 * 60 # One row per minute at most
+        self._write([(location, "observed", ts, float(current['temperature']), float(current['humidity']),
+                      float(current['pressure']), float(current['wind_speed']), None, float(current['clouds']), now)])
+
+    def record(self, endpoint, location, value):
+        """Records a WeatherStore fetch: "forecast" DataFrames or "weather" current readings."""
+        if endpoint == "forecast":
+            self.record_forecast(location, value)
+        elif endpoint == "weather":
+            self.record_current(location, value)
+
+    def query(self, location, start, end, resolution="day", kind="forecast"):
+        """
+        Returns one row per `resolution` bucket between `start` and `end`
+        (datetimes) with min/mean/max temperature, mean humidity, max wind,
+        total rain and the number of readings. Buckets follow local days.
+        """
+        bucket = RESOLUTIONS[resolution]
+        offset = int(datetime.now().astimezone().utcoffset().total_seconds())
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ((ts + :offset) / :bucket) * :bucket - :offset AS bucket_ts, "
+                "MIN(temperature), AVG(temperature), MAX(temperature), AVG(humidity), MAX(wind_speed), "
+                "SUM(rain), COUNT(*) "
+                "FROM readings WHERE location = :location AND kind = :kind AND ts >= :start AND ts < :end "
+                "GROUP BY bucket_ts ORDER BY bucket_ts",
+                {"offset": offset, "bucket": bucket, "location": location, "kind": kind,
+                 "start": int(start.timestamp()), "end": int(end.timestamp())}
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=[
+            "bucket", "temp_min", "temp_mean", "temp_max", "humidity_mean", "wind_max", "rain_total", "readings"
+        ])
+        frame["bucket"] = pd.to_datetime([datetime.fromtimestamp(ts) for ts in frame["bucket"]])
+        return frame
+
+    def stats(self):
+        with self._connect() as conn:
+            rows, locations = conn.execute("SELECT COUNT(*), COUNT(DISTINCT location) FROM readings").fetchone()
+        with self._lock:
+            return {
+                "history_rows": rows,
+                "history_locations": locations,
+                "history_rows_written": self._rows_written,
+                "history_write_errors": self._write_errors
+            }